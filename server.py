@@ -5,15 +5,19 @@
 PlayMCP에서 호스팅되며, 허깅페이스 계정 연동을 통해 이미지 생성 API를 사용합니다.
 """
 import os
+from contextlib import asynccontextmanager
 from typing import List, Optional, Annotated
 
 # FastAPI 관련 임포트만 최상위에 유지 (빠른 헬스체크를 위해)
-from fastapi import FastAPI, Response
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import Field
 
 
+# 프리뷰/이미지 URL의 베이스 (요청마다 환경 변수를 다시 읽지 않도록 시작 시 한 번만 조회)
+BASE_URL = os.environ.get("BASE_URL", "")
+
 # MCP 관련 전역 변수 (하단에서 초기화)
 _mcp = None
 _mcp_app = None
@@ -58,8 +62,51 @@ def _extract_hf_token_from_headers() -> Optional[str]:
         pass
     return None
 
-# FastAPI 앱 생성 (lifespan은 MCP 초기화 후 설정됨)
-app = FastAPI(title="카카오 이모티콘 MCP 서버")
+
+def _accepts_encoding(request: Request, encoding: str) -> bool:
+    """
+    Accept-Encoding 헤더가 주어진 인코딩을 허용하는지 확인합니다.
+    
+    q=0으로 명시적으로 거부한 경우는 허용하지 않으며, 인코딩이 직접 나열되지 않았으면
+    와일드카드(*)의 q 값을 따릅니다.
+    """
+    wildcard = None
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+        if name == encoding:
+            return q > 0
+        if name == "*":
+            wildcard = q > 0
+    return bool(wildcard)
+
+
+@asynccontextmanager
+async def _app_lifespan(fastapi_app: FastAPI):
+    """앱 수명 주기 (MCP 앱의 lifespan이 있으면 함께 실행하고, 종료 시 공유 리소스 정리)"""
+    try:
+        if _mcp_app is not None and hasattr(_mcp_app, 'lifespan'):
+            async with _mcp_app.lifespan(fastapi_app):
+                yield
+        else:
+            yield
+    finally:
+        from src.image_utils import close_http_client
+        await close_http_client()
+
+
+# FastAPI 앱 생성 (MCP 초기화 후 같은 lifespan으로 다시 생성됨)
+app = FastAPI(title="카카오 이모티콘 MCP 서버", lifespan=_app_lifespan)
 
 # CORS 설정 추가 (외부 MCP 클라이언트 접근 허용)
 app.add_middleware(
@@ -124,51 +171,132 @@ async def root():
             "preview": "/preview/{preview_id}",
             "download": "/download/{download_id}",
             "image": "/image/{image_id}",
+            "static": "/static/{asset_name}",
             "status": "/status/{task_id}",
-            "status_json": "/status/{task_id}/json"
+            "status_json": "/status/{task_id}/json",
+            "status_events": "/status/{task_id}/events"
         }
     }
 
 
 @app.get("/preview/{preview_id}", response_class=HTMLResponse)
-async def get_preview(preview_id: str):
+async def get_preview(preview_id: str, request: Request):
     """프리뷰 페이지 반환"""
     from src.preview_generator import get_preview_generator
     
-    generator = get_preview_generator(os.environ.get("BASE_URL", ""))
-    html = await generator.get_preview_html(preview_id)
-    if html:
-        return HTMLResponse(content=html)
+    generator = get_preview_generator(BASE_URL)
+    
+    # gzip을 지원하는 클라이언트에는 미리 압축해 둔 HTML을 그대로 전송
+    if _accepts_encoding(request, "gzip"):
+        compressed = await generator.get_preview_gzip(preview_id)
+        if compressed:
+            return Response(
+                content=compressed,
+                media_type="text/html; charset=utf-8",
+                headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+            )
+        return HTMLResponse(content="Preview not found", status_code=404)
+    
+    chunks = await generator.get_preview_stream(preview_id)
+    if chunks is not None:
+        # 렌더링되는 조각을 바로 전송 (전체 HTML을 메모리에 만들지 않음)
+        return StreamingResponse(chunks, media_type="text/html; charset=utf-8")
     return HTMLResponse(content="Preview not found", status_code=404)
 
 
+@app.get("/static/{asset_name}")
+async def get_static_asset(asset_name: str, request: Request):
+    """프리뷰/상태 페이지용 정적 파일(JS, CSS) 반환"""
+    from src.preview_generator import STATIC_ASSETS
+    
+    asset = STATIC_ASSETS.get(asset_name)
+    if not asset:
+        return Response(content="Not found", status_code=404)
+    
+    # URL에 내용 해시(?v=)가 포함되므로 길게 캐시, 버전 없는 요청은 ETag로 재검증
+    # gzip 본문과 원본은 서로 다른 표현이므로 ETag를 구분하고 304에도 Vary 지정
+    use_gzip = _accepts_encoding(request, "gzip")
+    etag = f'"{asset["version"]}-gz"' if use_gzip else f'"{asset["version"]}"'
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": etag,
+        "Vary": "Accept-Encoding"
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=asset["gzip"], media_type=asset["media_type"], headers=headers)
+    return Response(content=asset["data"], media_type=asset["media_type"], headers=headers)
+
+
 @app.get("/download/{download_id}")
 async def get_download(download_id: str):
     """ZIP 파일 다운로드"""
     from src.preview_generator import get_preview_generator
     
-    generator = get_preview_generator(os.environ.get("BASE_URL", ""))
-    zip_bytes = await generator.get_download_zip(download_id)
-    if zip_bytes:
-        return Response(
-            content=zip_bytes,
+    generator = get_preview_generator(BASE_URL)
+    # 저장된 이미지로 ZIP을 만들면서 바로 전송 (전체 아카이브를 메모리에 만들지 않음)
+    stream = await generator.get_download_stream(download_id)
+    if stream is not None:
+        return StreamingResponse(
+            stream,
             media_type="application/zip",
             headers={"Content-Disposition": "attachment; filename=emoticons.zip"}
         )
-    return Response(content="Download not found", status_code=404)
+    return Response(content="Download not found or expired", status_code=404)
 
 
 @app.get("/image/{image_id}")
-async def get_image(image_id: str):
+async def get_image(image_id: str, request: Request):
     """저장된 이미지 반환"""
     from src.preview_generator import get_preview_generator
     
-    generator = get_preview_generator(os.environ.get("BASE_URL", ""))
+    # 이미지 ID는 한 번 발급되면 내용이 바뀌지 않으므로 ID 자체를 ETag로 사용
+    etag = f'"{image_id}"'
+    cache_headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=31536000, immutable",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=cache_headers)
+    
+    generator = get_preview_generator(BASE_URL)
     image_info = await generator.get_image(image_id)
     if image_info:
         return Response(
             content=image_info["data"],
-            media_type=image_info["mime_type"]
+            media_type=image_info["mime_type"],
+            headers=cache_headers
+        )
+    return Response(content="Image not found", status_code=404)
+
+
+@app.get("/image/{image_id}/preview")
+async def get_preview_image(image_id: str, request: Request):
+    """프리뷰 표시용 이미지 반환 (AVIF를 받는 브라우저에는 더 작은 AVIF 변형)"""
+    from src.preview_generator import get_preview_generator, avif_preview_enabled
+    
+    # 서버가 AVIF를 만들 수 없으면 Accept와 무관하게 원본 표현만 제공
+    accept_avif = "image/avif" in request.headers.get("accept", "") and avif_preview_enabled()
+    # 같은 ID라도 Accept에 따라 다른 표현을 보내므로 ETag를 구분하고 Vary 지정
+    etag = f'"{image_id}-avif"' if accept_avif else f'"{image_id}"'
+    cache_headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Vary": "Accept",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=cache_headers)
+    
+    generator = get_preview_generator(BASE_URL)
+    image_info = await generator.get_preview_image(image_id, accept_avif)
+    if image_info:
+        return Response(
+            content=image_info["data"],
+            media_type=image_info["mime_type"],
+            headers=cache_headers
         )
     return Response(content="Image not found", status_code=404)
 
@@ -178,13 +306,7 @@ async def get_status_page(task_id: str):
     """생성 작업 상태 페이지 반환"""
     from src.preview_generator import get_preview_generator
     
-    generator = get_preview_generator(os.environ.get("BASE_URL", ""))
-    html = await generator.get_status_html(task_id)
-    if html:
-        return HTMLResponse(content=html)
-    
-    # 상태 페이지가 없으면 동적으로 생성
-    status_url = await generator.generate_status_page(task_id)
+    generator = get_preview_generator(BASE_URL)
     html = await generator.get_status_html(task_id)
     if html:
         return HTMLResponse(content=html)
@@ -192,9 +314,41 @@ async def get_status_page(task_id: str):
     return HTMLResponse(content="Status page not found", status_code=404)
 
 
+@app.get("/status/{task_id}/events")
+async def get_status_events(task_id: str):
+    """생성 작업 상태 스트림 (Server-Sent Events)"""
+    import json
+    from src.task_storage import get_task_storage, TaskStatus
+    
+    task_storage = get_task_storage()
+    
+    async def event_stream():
+        found = False
+        async for task in task_storage.watch_task(task_id):
+            if task is None:
+                # 프록시 연결 유지를 위한 주석 프레임
+                yield ": keepalive\n\n"
+                continue
+            found = True
+            yield f"data: {json.dumps(task.to_dict(), ensure_ascii=False)}\n\n"
+            if task.status in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+                yield "event: done\ndata: {}\n\n"
+        if not found:
+            error = {"error": "작업을 찾을 수 없습니다.", "task_id": task_id}
+            yield f"event: done\ndata: {json.dumps(error, ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/status/{task_id}/json")
-async def get_status_json(task_id: str):
-    """생성 작업 상태 JSON 반환"""
+async def get_status_json(task_id: str, request: Request):
+    """생성 작업 상태 JSON 반환 (변경이 없으면 304)"""
+    import hashlib
+    import json
     from src.task_storage import get_task_storage
     
     task_storage = get_task_storage()
@@ -203,7 +357,15 @@ async def get_status_json(task_id: str):
     if task is None:
         return {"error": "작업을 찾을 수 없습니다.", "task_id": task_id}
     
-    return task.to_dict()
+    body = json.dumps(task.to_dict(), ensure_ascii=False).encode("utf-8")
+    etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    
+    # 폴링 시 상태가 바뀌지 않았으면 본문 없이 응답
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 # ===== MCP 도구 등록 함수 (MCP 초기화 전에 정의되어야 함) =====
@@ -306,7 +468,7 @@ def _register_tools(mcp):
     )
     async def check_tool(
         emoticon_type: Annotated[EmoticonType, Field(description="검증할 이모티콘 타입: static, dynamic, big, static-mini, dynamic-mini")],
-        emoticons: Annotated[List[CheckEmoticonItem], Field(description="검사할 이모티콘 목록. 각 항목은 file_data(Base64 인코딩) 포함")],
+        emoticons: Annotated[List[CheckEmoticonItem], Field(description="검사할 이모티콘 목록. 각 항목은 file_data(Base64 인코딩 또는 생성 결과의 이미지 URL, 외부 URL 불가) 포함")],
         icon: Annotated[Optional[CheckEmoticonItem], Field(description="검사할 아이콘 이미지 (선택사항)")] = None
     ) -> dict:
         """이모티콘이 카카오톡 제출 규격에 맞는지 검사합니다."""
@@ -415,7 +577,7 @@ def _init_mcp_app():
         
         # MCP 앱의 lifespan이 있으면 새 FastAPI 앱 생성
         if hasattr(_mcp_app, 'lifespan'):
-            new_app = FastAPI(title="카카오 이모티콘 MCP 서버", lifespan=_mcp_app.lifespan)
+            new_app = FastAPI(title="카카오 이모티콘 MCP 서버", lifespan=_app_lifespan)
             new_app.add_middleware(
                 CORSMiddleware,
                 allow_origins=["*"],
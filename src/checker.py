@@ -1,6 +1,7 @@
 """
 이모티콘 사양 검사 모듈
 """
+import functools
 import io
 from typing import List, Optional, Tuple
 from PIL import Image
@@ -189,6 +190,7 @@ class EmoticonChecker:
         return issues
 
 
+@functools.cache
 def get_checker() -> EmoticonChecker:
-    """검사기 인스턴스 반환"""
+    """검사기 인스턴스 반환 (상태가 없으므로 하나를 공유)"""
     return EmoticonChecker()
@@ -27,7 +27,7 @@ class FileType(str, Enum):
     WEBP = "WebP"
 
 
-@dataclass
+@dataclass(slots=True)
 class EmoticonSpec:
     """이모티콘 타입별 사양"""
     type: EmoticonType
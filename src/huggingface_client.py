@@ -2,12 +2,29 @@
 Hugging Face Inference API 클라이언트
 """
 import io
+import os
 import asyncio
+import functools
+import hashlib
+from collections import OrderedDict
 from typing import Optional
 from huggingface_hub import InferenceClient
 from PIL import Image
 
 
+# 같은 입력(캐릭터 이미지 + 설명 + 애니메이션 여부)의 이모티콘 생성 결과 캐시 크기 (0이면 비활성)
+# 재시도나 중복 설명 요청 시 HF 호출을 생략하고, 진행 중인 동일 요청은 하나로 합침
+EMOTICON_CACHE_SIZE = int(os.environ.get("HF_EMOTICON_CACHE_SIZE", 32))
+_emoticon_cache: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+
+
+def _forget_failed(key: str, task: asyncio.Task) -> None:
+    """실패/취소된 생성 작업은 캐시에서 제거 (다음 요청에서 다시 시도)"""
+    if task.cancelled() or task.exception() is not None:
+        if _emoticon_cache.get(key) is task:
+            del _emoticon_cache[key]
+
+
 class HuggingFaceClient:
     """Hugging Face Inference API 클라이언트"""
     
@@ -136,6 +153,42 @@ class HuggingFaceClient:
         Returns:
             생성된 이모티콘 이미지/비디오 바이트
         """
+        if EMOTICON_CACHE_SIZE <= 0:
+            return await self._generate_emoticon(
+                character_image, emoticon_description, is_animated, animation_prompt
+            )
+        
+        digest = hashlib.sha256(character_image)
+        for part in (
+            self.IMAGE_EDIT_MODEL, self.IMAGE_TO_VIDEO_MODEL,
+            emoticon_description, str(is_animated), animation_prompt or ""
+        ):
+            digest.update(b"\0" + part.encode("utf-8"))
+        key = digest.hexdigest()
+        
+        task = _emoticon_cache.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._generate_emoticon(
+                character_image, emoticon_description, is_animated, animation_prompt
+            ))
+            task.add_done_callback(lambda t: _forget_failed(key, t))
+            _emoticon_cache[key] = task
+            while len(_emoticon_cache) > EMOTICON_CACHE_SIZE:
+                _emoticon_cache.popitem(last=False)
+        else:
+            _emoticon_cache.move_to_end(key)
+        
+        # 한 요청자가 취소되어도 같은 결과를 기다리는 다른 요청자의 작업은 유지
+        return await asyncio.shield(task)
+    
+    async def _generate_emoticon(
+        self,
+        character_image: bytes,
+        emoticon_description: str,
+        is_animated: bool,
+        animation_prompt: Optional[str]
+    ) -> bytes:
+        """이모티콘 생성 (캐시 없이 HF 호출)"""
         # 1. 이미지 편집으로 이모티콘 첫 프레임 생성
         edited_image = await self.edit_image(
             character_image,
@@ -157,8 +210,9 @@ class HuggingFaceClient:
         return video
 
 
+@functools.lru_cache(maxsize=32)
 def get_hf_client(api_key: str) -> HuggingFaceClient:
-    """HuggingFace 클라이언트 인스턴스 반환
+    """HuggingFace 클라이언트 인스턴스 반환 (토큰별로 재사용하여 연결 재활용)
     
     Args:
         api_key: Hugging Face API 키 (필수)
@@ -1,36 +1,95 @@
 """
 이미지 처리 유틸리티 함수
 """
-import base64
+import asyncio
+import binascii
+import functools
 import io
 import subprocess
 import tempfile
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, Optional, List
 from PIL import Image
 import httpx
 
+# pybase64는 SIMD 가속 base64 구현 (미설치 환경에서는 binascii로 폴백)
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
+
 from src.constants import EmoticonSpec, EMOTICON_SPECS
 
+# zopfli는 선택 의존성 (ZOPFLI=1일 때만 최종 PNG 재압축에 사용, 느리지만 20~30% 더 작음)
+try:
+    from zopfli import ZopfliPNG
+except ImportError:
+    ZopfliPNG = None
+
+ZOPFLI_ENABLED = os.environ.get("ZOPFLI", "0") == "1"
+
+
+# 이미지 인코딩/변환 전용 스레드 풀 (HF 호출이 기본 스레드 풀을 오래 점유해도 인코딩이 밀리지 않도록 분리)
+# Pillow 코덱은 GIL을 풀고 ffmpeg는 별도 프로세스로 실행되므로 스레드로도 여러 코어를 사용
+IMAGE_WORKERS = max(1, int(os.environ.get("IMAGE_WORKERS", os.cpu_count() or 4)))
+_image_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image")
+
+
+async def run_image_job(func, *args, **kwargs):
+    """CPU 위주의 이미지 처리 함수를 이미지 전용 스레드 풀에서 실행"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_image_executor, functools.partial(func, *args, **kwargs))
+
+
+# 외부 이미지 다운로드용 공유 클라이언트 (요청마다 만들지 않고 연결/TLS 세션을 재사용)
+_http_client: Optional[httpx.AsyncClient] = None
+# 다운로드 한 건의 전체 제한 시간 (초). httpx의 timeout은 읽기/쓰기 단계별 제한이므로 별도로 적용
+DOWNLOAD_TIMEOUT = 120.0
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """공유 httpx 클라이언트 반환 (첫 사용 시 생성)"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=httpx.Timeout(DOWNLOAD_TIMEOUT, connect=10.0),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """공유 httpx 클라이언트 종료 (서버 종료 시 호출)"""
+    global _http_client
+    if _http_client is not None:
+        client, _http_client = _http_client, None
+        await client.aclose()
+
 
 async def download_image(url: str) -> bytes:
     """URL에서 이미지 다운로드"""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        return response.content
+    response = await asyncio.wait_for(_get_http_client().get(url), timeout=DOWNLOAD_TIMEOUT)
+    response.raise_for_status()
+    return response.content
 
 
 def decode_base64_image(data: str) -> bytes:
     """Base64 인코딩된 이미지 디코딩"""
     if data.startswith("data:"):
         data = data.split(",", 1)[1]
-    return base64.b64decode(data)
+    if pybase64 is not None:
+        return pybase64.b64decode(data, validate=False)
+    # b64decode 래퍼의 입력 변환/검사 단계 없이 C 구현을 직접 호출
+    return binascii.a2b_base64(data)
 
 
 def encode_base64_image(data: bytes, mime_type: str = "image/png") -> str:
     """이미지를 Base64로 인코딩"""
-    encoded = base64.b64encode(data).decode("utf-8")
+    if pybase64 is not None:
+        encoded = pybase64.b64encode_as_string(data)
+    else:
+        encoded = binascii.b2a_base64(data, newline=False).decode("ascii")
     return f"data:{mime_type};base64,{encoded}"
 
 
@@ -64,6 +123,62 @@ def resize_image(
         return output.getvalue()
 
 
+@functools.cache
+def avif_supported() -> bool:
+    """설치된 Pillow가 AVIF 인코딩을 지원하는지 여부 (Pillow 11.2 이상의 AVIF 빌드 필요)"""
+    try:
+        from PIL import features
+        return bool(features.check("avif"))
+    except Exception:
+        return False
+
+
+def encode_preview_avif(image_bytes: bytes, quality: int) -> Optional[bytes]:
+    """
+    프리뷰 표시용 AVIF 변환 (다운로드/검사용 원본은 변경하지 않음)
+    
+    AVIF를 지원하지 않거나 변환에 실패한 경우, 애니메이션 이미지이거나
+    변환 결과가 원본보다 크면 None을 반환합니다.
+    """
+    if not avif_supported():
+        return None
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            if getattr(img, "is_animated", False):
+                return None
+            output = io.BytesIO()
+            img.save(output, format="AVIF", quality=quality)
+    except Exception as e:
+        print(f"AVIF preview encoding failed: {e}")
+        return None
+    avif = output.getvalue()
+    return avif if len(avif) < len(image_bytes) else None
+
+
+def _encode_within_size(encode, qualities: List[int], max_bytes: int) -> bytes:
+    """
+    크기 제한 안에서 가장 높은 품질로 인코딩
+    
+    qualities는 높은 품질 순서. 첫 품질이 맞으면 한 번에 끝나고, 넘치면 나머지 후보를
+    이진 탐색하여 인코딩 횟수를 줄입니다. 모두 넘치면 가장 낮은 품질 결과를 반환합니다.
+    """
+    result = encode(qualities[0])
+    if len(result) <= max_bytes:
+        return result
+    
+    best = None
+    lo, hi = 1, len(qualities) - 1
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        result = encode(qualities[mid])
+        if len(result) <= max_bytes:
+            best, hi = result, mid - 1
+        else:
+            lo = mid + 1
+    # 맞는 결과가 없으면 마지막으로 인코딩한 것이 가장 낮은 품질 결과
+    return best if best is not None else result
+
+
 def compress_image(
     image_bytes: bytes,
     max_size_kb: int,
@@ -76,19 +191,34 @@ def compress_image(
         if output_format.upper() == "PNG":
             img.save(output, format="PNG", optimize=True)
         elif output_format.upper() == "WEBP":
-            quality = 90
-            while quality > 10:
-                output = io.BytesIO()
-                img.save(output, format="WEBP", quality=quality)
-                if len(output.getvalue()) <= max_size_kb * 1024:
-                    break
-                quality -= 10
+            def _encode(quality: int) -> bytes:
+                buffer = io.BytesIO()
+                img.save(buffer, format="WEBP", quality=quality)
+                return buffer.getvalue()
+            
+            return _encode_within_size(_encode, list(range(90, 10, -10)), max_size_kb * 1024)
         else:
             img.save(output, format=output_format)
         
         return output.getvalue()
 
 
+def zopfli_recompress_png(png_bytes: bytes) -> bytes:
+    """PNG를 픽셀 변화 없이 zopfli로 재압축 (비활성/미설치/실패 시 원본 반환)"""
+    if not ZOPFLI_ENABLED or ZopfliPNG is None:
+        return png_bytes
+    try:
+        optimized = ZopfliPNG(
+            lossy_transparent=True,
+            iterations=15,
+            filter_strategies="01234mepb"
+        ).optimize(png_bytes)
+    except Exception as e:
+        print(f"zopfli recompression failed, keeping original PNG: {e}")
+        return png_bytes
+    return optimized if len(optimized) < len(png_bytes) else png_bytes
+
+
 def process_emoticon_image(
     image_bytes: bytes,
     spec: EmoticonSpec,
@@ -98,8 +228,17 @@ def process_emoticon_image(
     if target_size is None:
         target_size = spec.sizes[0]
     
+    # 이미 사양(크기/형식/용량)에 맞는 입력은 디코딩/재인코딩 없이 그대로 사용
+    # (Image.open은 헤더만 읽으므로 픽셀 디코딩 비용 없음)
+    if len(image_bytes) <= spec.max_size_kb * 1024:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            if img.size == tuple(target_size) and (img.format or "").upper() == spec.format.upper():
+                return image_bytes
+    
     resized = resize_image(image_bytes, target_size, spec.format)
     compressed = compress_image(resized, spec.max_size_kb, spec.format)
+    if spec.format.upper() == "PNG":
+        compressed = zopfli_recompress_png(compressed)
     
     return compressed
 
@@ -108,7 +247,7 @@ def create_icon(image_bytes: bytes, spec: EmoticonSpec) -> bytes:
     """이모티콘 아이콘 생성"""
     resized = resize_image(image_bytes, spec.icon_size, "PNG")
     compressed = compress_image(resized, spec.icon_max_size_kb, "PNG")
-    return compressed
+    return zopfli_recompress_png(compressed)
 
 
 def video_to_animated_webp(
@@ -126,9 +265,7 @@ def video_to_animated_webp(
         with open(video_path, "wb") as f:
             f.write(video_bytes)
         
-        result = b""
-        quality = 80
-        while quality > 10:
+        def _encode(quality: int) -> bytes:
             cmd = [
                 "ffmpeg", "-y",
                 "-i", video_path,
@@ -148,14 +285,10 @@ def video_to_animated_webp(
             subprocess.run(cmd, check=True, capture_output=True)
             
             with open(output_path, "rb") as f:
-                result = f.read()
-            
-            if len(result) <= max_size_kb * 1024:
-                return result
-            
-            quality -= 10
+                return f.read()
         
-        return result
+        # 손실 VP8 인코딩 품질을 80부터 낮추며 크기 제한에 맞춤 (넘치면 이진 탐색으로 인코딩 횟수 절감)
+        return _encode_within_size(_encode, list(range(80, 10, -10)), max_size_kb * 1024)
 
 
 def frames_to_animated_webp(
@@ -178,33 +311,17 @@ def frames_to_animated_webp(
     
     duration = int(1000 / fps)  # 밀리초
     
-    output = io.BytesIO()
-    images[0].save(
-        output,
-        format="WEBP",
-        save_all=True,
-        append_images=images[1:],
-        duration=duration,
-        loop=0,
-        quality=80
-    )
-    
-    result = output.getvalue()
-    
-    if len(result) > max_size_kb * 1024:
-        quality = 70
-        while quality > 10 and len(result) > max_size_kb * 1024:
-            output = io.BytesIO()
-            images[0].save(
-                output,
-                format="WEBP",
-                save_all=True,
-                append_images=images[1:],
-                duration=duration,
-                loop=0,
-                quality=quality
-            )
-            result = output.getvalue()
-            quality -= 10
+    def _encode(quality: int) -> bytes:
+        output = io.BytesIO()
+        images[0].save(
+            output,
+            format="WEBP",
+            save_all=True,
+            append_images=images[1:],
+            duration=duration,
+            loop=0,
+            quality=quality
+        )
+        return output.getvalue()
     
-    return result
+    return _encode_within_size(_encode, list(range(80, 10, -10)), max_size_kb * 1024)
@@ -187,7 +187,7 @@ TOOL_SCHEMAS: Dict[str, Dict[str, Any]] = {
                         "properties": {
                             "file_data": {
                                 "type": "string",
-                                "description": "Base64 인코딩된 파일 데이터"
+                                "description": "Base64 인코딩된 파일 데이터 또는 이 서버의 이미지 URL (생성 결과의 image_data URL 그대로 사용 가능, 외부 URL은 지원하지 않음)"
                             },
                             "filename": {
                                 "type": "string",
@@ -203,7 +203,7 @@ TOOL_SCHEMAS: Dict[str, Dict[str, Any]] = {
                     "properties": {
                         "file_data": {
                             "type": "string",
-                            "description": "Base64 인코딩된 파일 데이터"
+                            "description": "Base64 인코딩된 파일 데이터 또는 이 서버의 이미지 URL (생성 결과의 image_data URL 그대로 사용 가능, 외부 URL은 지원하지 않음)"
                         },
                         "filename": {
                             "type": "string",
@@ -2,17 +2,22 @@
 MCP 요청/응답을 위한 Pydantic 모델 정의
 """
 from typing import Optional, List, Union
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from src.constants import EmoticonType, FileType, FileExtension
 
 
-class EmoticonPlan(BaseModel):
+class _EnumValueModel(BaseModel):
+    """Enum 필드를 검증 후 문자열 값으로 보관하는 요청 모델 기반 클래스 (도구 함수에서 .value 변환 생략)"""
+    model_config = ConfigDict(use_enum_values=True)
+
+
+class EmoticonPlan(_EnumValueModel):
     """개별 이모티콘 기획"""
     description: str = Field(..., description="이모티콘 설명 (예: '손 흔드는 고양이', '화난 고양이')")
     file_type: FileType = Field(..., description="파일 형식 (PNG 또는 WebP)")
 
 
-class BeforePreviewRequest(BaseModel):
+class BeforePreviewRequest(_EnumValueModel):
     """before-preview 요청 모델"""
     emoticon_type: EmoticonType = Field(..., description="이모티콘 타입")
     title: str = Field(..., description="이모티콘 제목")
@@ -27,13 +32,13 @@ class BeforePreviewResponse(BaseModel):
     total_count: int = Field(..., description="계획된 이모티콘 총 개수")
 
 
-class EmoticonGenerateItem(BaseModel):
+class EmoticonGenerateItem(_EnumValueModel):
     """개별 이모티콘 생성 요청"""
     description: str = Field(..., description="이모티콘 상황/표정/포즈 설명 (영어로 작성! 예: 'excited cat jumping', 'sleeping cat curled up'). 이미지 생성 AI는 영어 프롬프트에서 더 좋은 결과를 냅니다.")
     file_extension: FileExtension = Field(..., description="파일 확장자 (png 또는 webp)")
 
 
-class GenerateRequest(BaseModel):
+class GenerateRequest(_EnumValueModel):
     """generate 요청 모델"""
     emoticon_type: EmoticonType = Field(..., description="이모티콘 타입")
     character_description: Optional[str] = Field(None, description="베이스 캐릭터 설명 (영어로 작성! 예: 'cute white cat with big round eyes', 'small brown puppy with floppy ears'). 이미지 생성 AI는 영어 프롬프트에서 더 좋은 결과를 냅니다.")
@@ -73,7 +78,7 @@ class EmoticonImage(BaseModel):
     frames: Optional[List[str]] = Field(None, description="움직이는 이모티콘의 경우 프레임 이미지들")
 
 
-class AfterPreviewRequest(BaseModel):
+class AfterPreviewRequest(_EnumValueModel):
     """after-preview 요청 모델"""
     emoticon_type: EmoticonType = Field(..., description="이모티콘 타입")
     title: str = Field(..., description="이모티콘 제목")
@@ -91,11 +96,11 @@ class AfterPreviewResponse(BaseModel):
 
 class CheckEmoticonItem(BaseModel):
     """검사할 이모티콘 항목"""
-    file_data: str = Field(..., description="파일 데이터 (base64)")
+    file_data: str = Field(..., description="파일 데이터 (base64 또는 이 서버의 이미지 URL)")
     filename: Optional[str] = Field(None, description="파일명")
 
 
-class CheckRequest(BaseModel):
+class CheckRequest(_EnumValueModel):
     """check 요청 모델"""
     emoticon_type: EmoticonType = Field(..., description="이모티콘 타입")
     emoticons: List[CheckEmoticonItem] = Field(..., description="검사할 이모티콘 목록")
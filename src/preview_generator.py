@@ -4,27 +4,30 @@
 Redis를 사용하여 프리뷰, 이미지, ZIP 파일을 저장합니다.
 REDIS_URL이 설정되지 않은 경우 메모리 기반 저장소로 폴백합니다.
 """
-import secrets
-import string
-import base64
-import zipfile
-import io
-from typing import List, Optional, Dict, Any
-from jinja2 import Template
+import asyncio
+import functools
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import AsyncIterator, Callable, Iterable, List, Optional, Dict, Any
+from jinja2 import DictLoader, Environment, FileSystemBytecodeCache
+from markupsafe import Markup, escape
 
-from src.constants import EMOTICON_SPECS, EMOTICON_TYPE_NAMES, EmoticonType, get_emoticon_spec
-from src.redis_client import get_storage, get_ttl, preview_key, image_key, zip_key, status_key
+# pybase64는 SIMD 가속 base64 구현 (미설치 환경에서는 표준 라이브러리로 폴백)
+try:
+    import pybase64 as _b64
+except ImportError:
+    import base64 as _b64
 
+from src.constants import EMOTICON_SPECS, EMOTICON_TYPE_NAMES, EmoticonSpec, EmoticonType
+from src.redis_client import get_storage, get_ttl, preview_key, image_key, zip_key
 
-# before-preview 템플릿 (기획 단계)
-BEFORE_PREVIEW_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="ko">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=1.0, user-scalable=no">
-    <title>{{ title }} - 이모티콘 기획 프리뷰</title>
-    <style>
+
+# before-preview 정적 CSS (Jinja 치환 없음, 전역 변수로 템플릿에 주입)
+_BEFORE_CSS = """
         :root {
             --bg-primary: #000000;
             --bg-secondary: #1a1a1a;
@@ -641,106 +644,10 @@ BEFORE_PREVIEW_TEMPLATE = """
             font-size: 12px;
             font-weight: 500;
         }
-    </style>
-</head>
-<body>
-    <div class="chat-container light-mode" id="chatContainer">
-        <div class="header">
-            <div class="header-back">
-                <svg width="20" height="20" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
-                    <path d="M15 18l-6-6 6-6"/>
-                </svg>
-            </div>
-            <div class="header-title">{{ title }}</div>
-            <div class="header-actions">
-                <span class="badge">기획</span>
-                <button class="mode-toggle" id="modeToggle" title="다크/라이트 모드 전환">☀️</button>
-            </div>
-        </div>
-        
-        <div class="chat-area" id="chatArea"></div>
-        
-        <div class="input-wrapper" id="inputWrapper">
-            <div class="selection-popup" id="selectionPopup">
-                <button class="selection-star" id="selectionStar">☆</button>
-                <div class="selection-emoticon" id="selectionEmoticon">
-                    <span class="selection-emoticon-number" id="selectionNumber"></span>
-                    <span class="selection-emoticon-desc" id="selectionDesc"></span>
-                </div>
-                <button class="selection-close" id="selectionClose">✕</button>
-            </div>
-            <div class="input-bar">
-                <button class="input-btn" id="addBtn">+</button>
-                <div class="input-field-wrapper" id="inputFieldWrapper">
-                    <div class="input-mini-emoticons" id="inputMiniEmoticons" style="display: none;"></div>
-                    <input type="text" class="input-field" id="messageInput" placeholder="메시지 입력">
-                    <button class="emoji-btn" id="emojiBtn">☺︎</button>
-                </div>
-                <button class="send-btn" id="sendBtn">#</button>
-            </div>
-        </div>
-        
-        <div class="emoticon-panel" id="emoticonPanel">
-            <div class="panel-drag-handle" id="dragHandle">
-                <div class="panel-drag-bar"></div>
-            </div>
-            
-            <div class="panel-category-bar">
-                <button class="panel-category-btn">검색</button>
-                <button class="panel-category-btn{% if not is_mini %} active{% endif %}" data-category="emoticon">이모티콘</button>
-                <button class="panel-category-btn{% if is_mini %} active{% endif %}" data-category="mini">미니 이모티콘</button>
-            </div>
-            
-            <div class="panel-tabs">
-                <button class="panel-tab panel-tab-stacked"><span>○</span><span>☆</span></button>
-                <div class="panel-tab-divider"></div>
-                <button class="panel-tab panel-tab-all">ALL</button>
-                <button class="panel-tab active" id="emoticonTabBtn">☺︎</button>
-            </div>
-            
-            <div class="panel-title-row">
-                <span class="panel-title">{{ title }}</span>
-                <span class="panel-title-arrow">›</span>
-                <span class="panel-type-badge">{{ emoticon_type_name }}</span>
-            </div>
-            
-            <div class="emoticon-grid{% if is_mini %} mini-grid{% elif is_big %} big-grid{% endif %}" id="emoticonGrid">
-                {% for plan in plans %}
-                <div class="emoticon-item{% if is_mini %} mini-item{% elif is_big %} big-item{% endif %}" data-index="{{ loop.index }}" data-desc="{{ plan.description }}">
-                    <span class="emoticon-number">{{ loop.index }}</span>
-                    <span class="emoticon-desc">{{ plan.description }}</span>
-                </div>
-                {% endfor %}
-            </div>
-            
-            <div class="info-toggle">
-                <button class="info-toggle-btn" id="infoToggleBtn">상세 정보 보기 ▼</button>
-            </div>
-            
-            <div class="info-section" id="infoSection">
-                <div class="info-row">
-                    <span class="info-label">이모티콘 타입</span>
-                    <span class="info-value">{{ emoticon_type_name }}</span>
-                </div>
-                <div class="info-row">
-                    <span class="info-label">총 개수</span>
-                    <span class="info-value">{{ plans|length }} / {{ spec.count }}개</span>
-                </div>
-                <div class="info-row">
-                    <span class="info-label">파일 형식</span>
-                    <span class="info-value">{{ spec.format }}</span>
-                </div>
-                <div class="info-row">
-                    <span class="info-label">크기</span>
-                    <span class="info-value">{{ spec.sizes[0][0] }} x {{ spec.sizes[0][1] }} px</span>
-                </div>
-            </div>
-        </div>
-    </div>
-    
+"""
 
-    
-    <script>
+# before-preview 정적 JS (Jinja 치환 없음, 전역 변수로 템플릿에 주입)
+_BEFORE_JS = """
         const chatContainer = document.getElementById('chatContainer');
         const chatArea = document.getElementById('chatArea');
         const inputWrapper = document.getElementById('inputWrapper');
@@ -754,7 +661,6 @@ BEFORE_PREVIEW_TEMPLATE = """
         const selectionNumber = document.getElementById('selectionNumber');
         const selectionDesc = document.getElementById('selectionDesc');
         const selectionStar = document.getElementById('selectionStar');
-        const selectionClose = document.getElementById('selectionClose');
         const modeToggle = document.getElementById('modeToggle');
         const infoToggleBtn = document.getElementById('infoToggleBtn');
         const infoSection = document.getElementById('infoSection');
@@ -768,12 +674,10 @@ BEFORE_PREVIEW_TEMPLATE = """
         let startY = 0;
         let panelHeight = 0;
         
-        // 미니 이모티콘 여부
-        const isMini = {{ 'true' if is_mini else 'false' }};
-        // 큰 이모티콘 여부
-        const isBig = {{ 'true' if is_big else 'false' }};
         // 입력칸에 추가된 미니 이모티콘 목록
         let miniEmoticons = [];
+        // 메시지 시각 포맷터 (메시지마다 새로 만들지 않도록 한 번만 생성)
+        const timeFormat = new Intl.DateTimeFormat('ko-KR', { hour: '2-digit', minute: '2-digit' });
         
         // Update send button state
         function updateSendButton() {
@@ -844,86 +748,99 @@ BEFORE_PREVIEW_TEMPLATE = """
             updateSendButton();
         }
         
-        sendBtn.addEventListener('click', sendMessage);
         messageInput.addEventListener('keypress', (e) => {
             if (e.key === 'Enter') {
                 sendMessage();
             }
         });
         
+        // 메시지는 프레임 단위로 모아 한 번에 추가 (메시지마다 스크롤 위치 계산으로 리플로우하지 않음)
+        const pendingMessages = [];
+        let flushScheduled = false;
+        // 채팅 영역에 유지할 최대 메시지 수 (오래된 메시지부터 제거하여 DOM 크기 제한)
+        const MAX_VISIBLE_MESSAGES = 50;
+        const visibleMessages = [];
+        
+        function appendMessage(message) {
+            pendingMessages.push(message);
+            if (flushScheduled) return;
+            flushScheduled = true;
+            requestAnimationFrame(flushMessages);
+        }
+        
+        function flushMessages() {
+            flushScheduled = false;
+            const frag = document.createDocumentFragment();
+            for (const message of pendingMessages) {
+                frag.appendChild(message);
+                visibleMessages.push(message);
+            }
+            pendingMessages.length = 0;
+            chatArea.appendChild(frag);
+            // 메시지가 아닌 고정 요소(다운로드 배너 등)는 유지
+            while (visibleMessages.length > MAX_VISIBLE_MESSAGES) {
+                visibleMessages.shift().remove();
+            }
+            chatArea.scrollTop = chatArea.scrollHeight;
+        }
+        
+        // 요소를 DOM API로 직접 생성 (HTML 문자열 파싱/이스케이프 없음, 텍스트는 textContent로 안전하게 설정)
+        function createEl(tag, className, text) {
+            const el = document.createElement(tag);
+            el.className = className;
+            if (text !== undefined) el.textContent = text;
+            return el;
+        }
+        
+        function createMessageTime() {
+            return createEl('span', 'message-time', timeFormat.format(new Date()));
+        }
+        
         // 미니 이모티콘만 전송 (6개 이하)
         function addMiniOnlyMessage(emojis) {
-            const message = document.createElement('div');
-            message.className = 'message-mini-only';
-            
-            const time = new Date().toLocaleTimeString('ko-KR', { hour: '2-digit', minute: '2-digit' });
-            
-            const itemsHtml = emojis.map(e => `<div class="mini-only-item">[${e.index}]</div>`).join('');
-            
-            message.innerHTML = `
-                <div class="mini-only-container">${itemsHtml}</div>
-                <span class="message-time">${time}</span>
-            `;
-            
-            chatArea.appendChild(message);
-            chatArea.scrollTop = chatArea.scrollHeight;
+            const message = createEl('div', 'message-mini-only');
+            const container = createEl('div', 'mini-only-container');
+            for (const e of emojis) {
+                container.appendChild(createEl('div', 'mini-only-item', `[${e.index}]`));
+            }
+            message.append(container, createMessageTime());
+            appendMessage(message);
         }
         
         // 텍스트와 미니 이모티콘 혼합 메시지
         function addMixedMessage(text, emojis) {
-            const message = document.createElement('div');
-            message.className = 'message';
-            
-            const time = new Date().toLocaleTimeString('ko-KR', { hour: '2-digit', minute: '2-digit' });
-            
+            const message = createEl('div', 'message');
+            const bubble = createEl('div', 'message-bubble', text);
             // 미니 이모티콘을 인라인으로 표시
-            const emojisHtml = emojis.map(e => `<span class="mini-emoticon-inline">[${e.index}]</span>`).join('');
-            const content = escapeHtml(text) + emojisHtml;
-            
-            message.innerHTML = `
-                <div class="message-bubble">${content}</div>
-                <span class="message-time">${time}</span>
-            `;
-            
-            chatArea.appendChild(message);
-            chatArea.scrollTop = chatArea.scrollHeight;
+            for (const e of emojis) {
+                bubble.appendChild(createEl('span', 'mini-emoticon-inline', `[${e.index}]`));
+            }
+            message.append(bubble, createMessageTime());
+            appendMessage(message);
         }
         
         // Add message to chat
         function addMessage(content, type, desc = '') {
-            const message = document.createElement('div');
-            message.className = 'message';
-            
-            const time = new Date().toLocaleTimeString('ko-KR', { hour: '2-digit', minute: '2-digit' });
+            const message = createEl('div', 'message');
+            let bubble;
             
             if (type === 'text') {
-                message.innerHTML = `
-                    <div class="message-bubble">${escapeHtml(content)}</div>
-                    <span class="message-time">${time}</span>
-                `;
+                bubble = createEl('div', 'message-bubble', content);
             } else if (type === 'emoticon') {
                 const bigClass = isBig ? ' big-emoticon' : '';
-                message.innerHTML = `
-                    <div class="message-bubble message-emoticon">
-                        <div class="message-emoticon-content${bigClass}">${content}</div>
-                        <div class="message-emoticon-label">${escapeHtml(desc)}</div>
-                    </div>
-                    <span class="message-time">${time}</span>
-                `;
+                bubble = createEl('div', 'message-bubble message-emoticon');
+                bubble.append(
+                    createEl('div', 'message-emoticon-content' + bigClass, content),
+                    createEl('div', 'message-emoticon-label', desc)
+                );
             }
             
-            chatArea.appendChild(message);
-            chatArea.scrollTop = chatArea.scrollHeight;
-        }
-        
-        function escapeHtml(text) {
-            const div = document.createElement('div');
-            div.textContent = text;
-            return div.innerHTML;
+            message.append(bubble, createMessageTime());
+            appendMessage(message);
         }
         
         // Toggle emoticon panel
-        emojiBtn.addEventListener('click', () => {
+        function togglePanel() {
             isPanelOpen = !isPanelOpen;
             emoticonPanel.classList.toggle('open', isPanelOpen);
             emojiBtn.classList.toggle('active', isPanelOpen);
@@ -932,27 +849,26 @@ BEFORE_PREVIEW_TEMPLATE = """
                 emoticonPanel.style.maxHeight = '';
                 closeSelection();
             }
-        });
+        }
         
         // Emoticon selection
         emoticonGrid.addEventListener('click', (e) => {
             const item = e.target.closest('.emoticon-item');
-            if (!item) return;
+            if (!item || !emoticonGrid.contains(item)) return;
+            // 그리드 하나의 리스너에서 처리하므로 항목 정보는 클릭 시에만 읽음
+            const emoticon = {
+                index: item.dataset.index,
+                desc: item.dataset.desc
+            };
             
             if (isMini) {
                 // 미니 이모티콘: 입력칸에 추가
-                miniEmoticons.push({
-                    index: item.dataset.index,
-                    desc: item.dataset.desc
-                });
+                miniEmoticons.push(emoticon);
                 updateMiniInput();
                 return;
             }
             
-            selectedEmoticon = {
-                index: item.dataset.index,
-                desc: item.dataset.desc
-            };
+            selectedEmoticon = emoticon;
             
             selectionNumber.textContent = selectedEmoticon.index;
             selectionDesc.textContent = selectedEmoticon.desc;
@@ -970,17 +886,16 @@ BEFORE_PREVIEW_TEMPLATE = """
         }
         
         // Selection popup controls
-        selectionClose.addEventListener('click', closeSelection);
-        
-        selectionStar.addEventListener('click', () => {
+        function toggleStar() {
             isStarred = !isStarred;
             selectionStar.textContent = isStarred ? '★' : '☆';
             selectionStar.classList.toggle('filled', isStarred);
-        });
+        }
         
         // Drag handle for panel resize
         dragHandle.addEventListener('mousedown', startDrag);
-        dragHandle.addEventListener('touchstart', startDrag, { passive: false });
+        // touchstart에서는 preventDefault를 호출하지 않으므로 passive로 등록 (스크롤 차단 없음)
+        dragHandle.addEventListener('touchstart', startDrag, { passive: true });
         
         function startDrag(e) {
             isDragging = true;
@@ -1010,38 +925,64 @@ BEFORE_PREVIEW_TEMPLATE = """
         }
         
         // Mode toggle
-        modeToggle.addEventListener('click', () => {
+        function toggleMode() {
             chatContainer.classList.toggle('light-mode');
             modeToggle.textContent = chatContainer.classList.contains('light-mode') ? '☀️' : '🌙';
-        });
+        }
         
         // Info toggle
-        infoToggleBtn.addEventListener('click', () => {
+        function toggleInfo() {
             const isOpen = infoSection.classList.toggle('open');
             infoToggleBtn.textContent = isOpen ? '상세 정보 닫기 ▲' : '상세 정보 보기 ▼';
+        }
+        
+        // 버튼 클릭은 컨테이너의 리스너 하나에서 data-action으로 분기
+        const clickActions = {
+            send: sendMessage,
+            togglePanel: togglePanel,
+            closeSelection: closeSelection,
+            toggleStar: toggleStar,
+            toggleMode: toggleMode,
+            toggleInfo: toggleInfo
+        };
+        chatContainer.addEventListener('click', (e) => {
+            const target = e.target.closest('[data-action]');
+            if (!target) return;
+            const action = clickActions[target.dataset.action];
+            if (action) action();
         });
-    </script>
-</body>
-</html>
 """
 
-# status page 템플릿 (진행 상황)
-STATUS_PAGE_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="ko">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>이모티콘 생성 중...</title>
-    <style>
+# after-preview 정적 CSS (/static 경로로 분리 제공, 브라우저 캐시 활용)
+_AFTER_CSS = """
         :root {
-            --bg-primary: #1a1a1a;
-            --bg-secondary: #2a2a2a;
+            --bg-primary: #000000;
+            --bg-secondary: #1a1a1a;
+            --bg-tertiary: #2a2a2a;
+            --bg-input: #2a2a2a;
             --text-primary: #ffffff;
             --text-secondary: #999999;
+            --text-muted: #666666;
+            --border-color: #333333;
             --kakao-yellow: #fee500;
-            --success-green: #4ade80;
-            --error-red: #f87171;
+            --kakao-brown: #3c1e1e;
+            --bubble-mine: #fee500;
+            --bubble-mine-text: #3c1e1e;
+        }
+        .light-mode {
+            --bg-primary: #b2c7d9;
+            --bg-secondary: #ffffff;
+            --bg-tertiary: #f5f5f5;
+            --bg-input: #ffffff;
+            --text-primary: #333333;
+            --text-secondary: #666666;
+            --text-muted: #999999;
+            --border-color: #e5e5e5;
+            --bubble-mine: #fee500;
+            --bubble-mine-text: #3c1e1e;
+        }
+        .light-mode .mini-emoticon-inline {
+            background-color: rgba(0,0,0,0.08);
         }
         * {
             margin: 0;
@@ -1049,954 +990,1151 @@ STATUS_PAGE_TEMPLATE = """
             box-sizing: border-box;
         }
         body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background-color: var(--bg-primary);
-            color: var(--text-primary);
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+            background-color: #000;
             min-height: 100vh;
+            min-height: 100dvh;
             display: flex;
             justify-content: center;
             align-items: center;
-            padding: 20px;
         }
-        .container {
+        .chat-container {
             width: 100%;
-            max-width: 500px;
-            background-color: var(--bg-secondary);
-            border-radius: 20px;
-            padding: 32px;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.3);
+            max-width: 400px;
+            height: 100vh;
+            height: 100dvh;
+            background-color: var(--bg-primary);
+            display: flex;
+            flex-direction: column;
+            position: relative;
+            overflow: hidden;
         }
         .header {
-            text-align: center;
-            margin-bottom: 32px;
-        }
-        .header h1 {
-            font-size: 24px;
-            margin-bottom: 8px;
+            background-color: var(--bg-secondary);
+            padding: 12px 16px;
+            display: flex;
+            align-items: center;
+            border-bottom: 1px solid var(--border-color);
+            z-index: 10;
         }
-        .header .task-id {
-            font-size: 12px;
-            color: var(--text-secondary);
-            font-family: monospace;
+        .header-back {
+            width: 24px;
+            height: 24px;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            color: var(--text-primary);
+            cursor: pointer;
         }
-        .status-badge {
-            display: inline-block;
-            padding: 6px 16px;
-            border-radius: 20px;
-            font-size: 14px;
+        .header-title {
+            font-size: 16px;
             font-weight: 600;
-            margin: 16px 0;
+            color: var(--text-primary);
+            flex: 1;
+            text-align: center;
         }
-        .status-pending {
-            background-color: var(--text-secondary);
-            color: #000;
+        .header-actions {
+            display: flex;
+            gap: 12px;
+            align-items: center;
         }
-        .status-running {
+        .badge {
             background-color: var(--kakao-yellow);
-            color: #000;
-        }
-        .status-completed {
-            background-color: var(--success-green);
-            color: #000;
+            color: var(--kakao-brown);
+            padding: 4px 8px;
+            border-radius: 12px;
+            font-size: 11px;
+            font-weight: 600;
         }
-        .status-failed {
-            background-color: var(--error-red);
-            color: #000;
-        }
-        .progress-section {
-            margin: 24px 0;
+        .mode-toggle {
+            width: 32px;
+            height: 32px;
+            border-radius: 50%;
+            background: var(--bg-tertiary);
+            border: none;
+            cursor: pointer;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            color: var(--text-primary);
+            font-size: 14px;
         }
-        .progress-bar-container {
-            background-color: var(--bg-primary);
-            border-radius: 10px;
-            height: 20px;
-            overflow: hidden;
-            margin-bottom: 12px;
+        .chat-area {
+            flex: 1;
+            padding: 16px;
+            overflow-y: auto;
+            display: flex;
+            flex-direction: column;
+            gap: 8px;
         }
-        .progress-bar {
-            height: 100%;
-            background: linear-gradient(90deg, var(--kakao-yellow), #ffd000);
-            border-radius: 10px;
-            transition: width 0.5s ease;
+        .download-banner {
             display: flex;
-            align-items: center;
             justify-content: center;
+            padding: 12px;
         }
-        .progress-bar span {
-            font-size: 11px;
+        .download-btn {
+            background-color: var(--kakao-yellow);
+            color: var(--kakao-brown);
+            padding: 10px 20px;
+            border-radius: 20px;
+            font-size: 13px;
             font-weight: 600;
-            color: #000;
+            text-decoration: none;
+            transition: all 0.2s;
+            box-shadow: 0 2px 8px rgba(0,0,0,0.2);
         }
-        .progress-text {
+        .download-btn:hover {
+            transform: scale(1.05);
+        }
+        .message {
             display: flex;
-            justify-content: space-between;
+            flex-direction: column;
+            align-items: flex-end;
+            max-width: 80%;
+            margin-left: auto;
+        }
+        .message-bubble {
+            background-color: var(--bubble-mine);
+            color: var(--bubble-mine-text);
+            padding: 10px 14px;
+            border-radius: 16px 16px 4px 16px;
             font-size: 14px;
-            color: var(--text-secondary);
+            line-height: 1.4;
+            word-break: break-word;
         }
-        .current-task {
-            text-align: center;
-            padding: 16px;
-            background-color: var(--bg-primary);
-            border-radius: 12px;
-            margin: 16px 0;
+        .message-emoticon {
+            background: transparent;
+            padding: 4px;
         }
-        .current-task-label {
-            font-size: 12px;
-            color: var(--text-secondary);
-            margin-bottom: 8px;
+        .message-emoticon img {
+            max-width: 120px;
+            max-height: 120px;
+            object-fit: contain;
         }
-        .current-task-desc {
-            font-size: 16px;
-            color: var(--text-primary);
+        .message-emoticon.big-emoticon img {
+            max-width: 240px;
+            max-height: 240px;
         }
-        .emoticon-grid {
-            display: grid;
-            grid-template-columns: repeat(4, 1fr);
+        .message-time {
+            font-size: 10px;
+            color: var(--text-muted);
+            margin-top: 4px;
+        }
+        .input-wrapper {
+            position: relative;
+            background-color: var(--bg-secondary);
+            border-top: 1px solid var(--border-color);
+            z-index: 100;
+        }
+        .input-bar {
+            display: flex;
+            align-items: center;
+            padding: 8px 12px;
             gap: 8px;
-            margin-top: 24px;
-            max-height: 300px;
-            overflow-y: auto;
         }
-        .emoticon-item {
-            aspect-ratio: 1;
-            background-color: var(--bg-primary);
-            border-radius: 12px;
+        .input-btn {
+            width: 36px;
+            height: 36px;
+            border-radius: 50%;
+            border: none;
+            background-color: var(--bg-tertiary);
+            color: var(--text-secondary);
+            font-size: 20px;
+            cursor: pointer;
             display: flex;
             align-items: center;
             justify-content: center;
-            overflow: hidden;
+            flex-shrink: 0;
+            transition: all 0.2s;
         }
-        .emoticon-item img {
-            max-width: 100%;
-            max-height: 100%;
-            object-fit: contain;
+        .input-btn:hover {
+            background-color: var(--border-color);
         }
-        .emoticon-item.pending {
-            opacity: 0.3;
+        .input-field-wrapper {
+            flex: 1;
+            display: flex;
+            align-items: center;
+            background-color: var(--bg-input);
+            border: 1px solid var(--border-color);
+            border-radius: 20px;
+            padding: 0 4px 0 14px;
+            min-height: 40px;
         }
-        .emoticon-item.pending::after {
-            content: '';
-            width: 24px;
-            height: 24px;
-            border: 2px solid var(--text-secondary);
+        .input-field {
+            flex: 1;
+            border: none;
+            background: transparent;
+            color: var(--text-primary);
+            font-size: 14px;
+            outline: none;
+            padding: 8px 0;
+            min-width: 50px;
+        }
+        .input-field::placeholder {
+            color: var(--text-muted);
+        }
+        .input-field-wrapper.has-mini {
+            flex-wrap: wrap;
+            padding: 6px 4px 6px 10px;
+            gap: 4px;
+        }
+        .emoji-btn {
+            width: 32px;
+            height: 32px;
             border-radius: 50%;
+            border: none;
+            background: transparent;
+            color: var(--text-secondary);
+            font-size: 18px;
+            cursor: pointer;
+            display: flex;
+            align-items: center;
+            justify-content: center;
         }
-        .instructions {
-            margin-top: 24px;
-            padding: 16px;
-            background-color: rgba(254, 229, 0, 0.1);
-            border: 1px solid rgba(254, 229, 0, 0.3);
-            border-radius: 12px;
+        .emoji-btn:hover {
+            background-color: var(--bg-tertiary);
         }
-        .instructions h3 {
-            font-size: 14px;
+        .emoji-btn.active {
             color: var(--kakao-yellow);
-            margin-bottom: 8px;
         }
-        .instructions p {
-            font-size: 13px;
+        .send-btn {
+            width: 36px;
+            height: 36px;
+            border-radius: 50%;
+            border: none;
+            background-color: var(--bg-tertiary);
             color: var(--text-secondary);
-            line-height: 1.5;
+            font-size: 16px;
+            cursor: pointer;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            flex-shrink: 0;
+            transition: all 0.2s;
         }
-        .instructions code {
-            background-color: var(--bg-primary);
-            padding: 2px 6px;
-            border-radius: 4px;
-            font-family: monospace;
-            font-size: 12px;
-            color: var(--kakao-yellow);
+        .send-btn.active {
+            background-color: var(--kakao-yellow);
+            color: var(--kakao-brown);
         }
-        .error-message {
-            margin-top: 16px;
-            padding: 16px;
-            background-color: rgba(248, 113, 113, 0.1);
-            border: 1px solid rgba(248, 113, 113, 0.3);
-            border-radius: 12px;
-            color: var(--error-red);
-            font-size: 14px;
+        .emoticon-panel {
+            background-color: var(--bg-secondary);
+            border-radius: 16px 16px 0 0;
+            display: flex;
+            flex-direction: column;
+            max-height: 0;
+            overflow: hidden;
+            transition: max-height 0.3s ease-out;
         }
-        .result-section {
-            margin-top: 24px;
-            text-align: center;
+        .emoticon-panel.open {
+            max-height: 60vh;
         }
-        .result-section h3 {
-            font-size: 18px;
-            color: var(--success-green);
-            margin-bottom: 16px;
+        .panel-drag-handle {
+            padding: 12px;
+            display: flex;
+            justify-content: center;
+            cursor: grab;
         }
-        .spinner {
-            display: inline-block;
+        .panel-drag-handle:active {
+            cursor: grabbing;
+        }
+        .panel-drag-bar {
             width: 40px;
-            height: 40px;
-            border: 3px solid var(--bg-primary);
-            border-top-color: var(--kakao-yellow);
-            border-radius: 50%;
-            animation: spin 1s linear infinite;
-            margin: 16px 0;
+            height: 4px;
+            background-color: var(--border-color);
+            border-radius: 2px;
         }
-        @keyframes spin {
-            to { transform: rotate(360deg); }
+        .panel-category-bar {
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            margin: 0 12px 12px;
+            padding: 4px;
+            background-color: var(--bg-tertiary);
+            border-radius: 20px;
+            gap: 2px;
+            width: fit-content;
         }
-        .refresh-note {
+        .panel-category-btn {
+            padding: 6px 12px;
+            border: none;
+            background: transparent;
+            color: var(--text-muted);
             font-size: 12px;
-            color: var(--text-secondary);
-            margin-top: 16px;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>이모티콘 생성</h1>
-            <div class="task-id">작업 ID: {{ task_id }}</div>
-        </div>
-        
-        <div id="statusContent">
-            <div style="text-align: center;">
-                <div class="spinner"></div>
-                <p>로딩 중...</p>
-            </div>
-        </div>
-    </div>
-    
-    <script>
-        const taskId = '{{ task_id }}';
-        
-        async function fetchStatus() {
-            try {
-                const response = await fetch(`/status/${taskId}/json`);
-                const data = await response.json();
-                updateUI(data);
-                
-                if (data.status !== 'completed' && data.status !== 'failed') {
-                    setTimeout(fetchStatus, 2000);
-                }
-            } catch (error) {
-                console.error('Status fetch error:', error);
-                setTimeout(fetchStatus, 3000);
-            }
-        }
-        
-        function updateUI(data) {
-            const content = document.getElementById('statusContent');
-            
-            let statusClass = 'status-' + data.status;
-            let statusText = {
-                'pending': '대기 중',
-                'running': '생성 중',
-                'completed': '완료',
-                'failed': '실패'
-            }[data.status] || data.status;
-            
-            let html = `
-                <div style="text-align: center;">
-                    <span class="status-badge ${statusClass}">${statusText}</span>
-                </div>
-            `;
-            
-            if (data.status === 'running' || data.status === 'pending') {
-                html += `
-                    <div class="progress-section">
-                        <div class="progress-bar-container">
-                            <div class="progress-bar" style="width: ${data.progress_percent}%">
-                                <span>${data.progress_percent}%</span>
-                            </div>
-                        </div>
-                        <div class="progress-text">
-                            <span>${data.completed_count} / ${data.total_count} 완료</span>
-                            <span>${data.emoticon_type}</span>
-                        </div>
-                    </div>
-                `;
-                
-                if (data.current_description) {
-                    html += `
-                        <div class="current-task">
-                            <div class="current-task-label">현재 작업</div>
-                            <div class="current-task-desc">${data.current_description}</div>
-                        </div>
-                    `;
-                }
-                
-                html += `
-                    <div class="spinner" style="margin: 24px auto; display: block;"></div>
-                    <p class="refresh-note">페이지가 자동으로 업데이트됩니다...</p>
-                `;
-            }
-            
-            if (data.status === 'completed') {
-                html += `
-                    <div class="result-section">
-                        <h3>✅ 생성 완료!</h3>
-                        <p>이제 AI에게 작업 ID를 전달하여 결과를 확인하세요.</p>
-                    </div>
-                    <div class="instructions">
-                        <h3>다음 단계</h3>
-                        <p>AI에게 다음 메시지를 보내세요:</p>
-                        <p style="margin-top: 8px;"><code>이모티콘 생성 완료! 작업 ID: ${taskId}</code></p>
-                    </div>
-                `;
-                
-                if (data.emoticons && data.emoticons.length > 0) {
-                    html += `<div class="emoticon-grid">`;
-                    data.emoticons.forEach(e => {
-                        html += `
-                            <div class="emoticon-item">
-                                <img src="${e.image_data}" alt="이모티콘">
-                            </div>
-                        `;
-                    });
-                    html += `</div>`;
-                }
-            }
-            
-            if (data.status === 'failed') {
-                html += `
-                    <div class="error-message">
-                        <strong>오류 발생:</strong> ${data.error_message || '알 수 없는 오류'}
-                    </div>
-                    <div class="instructions">
-                        <h3>해결 방법</h3>
-                        <p>AI에게 다시 생성을 요청해보세요.</p>
-                    </div>
-                `;
-            }
-            
-            content.innerHTML = html;
-        }
-        
-        fetchStatus();
-    </script>
-</body>
-</html>
-"""
-
-# after-preview 템플릿 (완성본)
-AFTER_PREVIEW_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="ko">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=1.0, user-scalable=no">
-    <title>{{ title }} - 이모티콘 프리뷰</title>
-    <style>
-        :root {
-            --bg-primary: #000000;
-            --bg-secondary: #1a1a1a;
-            --bg-tertiary: #2a2a2a;
-            --bg-input: #2a2a2a;
-            --text-primary: #ffffff;
-            --text-secondary: #999999;
-            --text-muted: #666666;
-            --border-color: #333333;
-            --kakao-yellow: #fee500;
-            --kakao-brown: #3c1e1e;
-            --bubble-mine: #fee500;
-            --bubble-mine-text: #3c1e1e;
-        }
-        .light-mode {
-            --bg-primary: #b2c7d9;
-            --bg-secondary: #ffffff;
-            --bg-tertiary: #f5f5f5;
-            --bg-input: #ffffff;
-            --text-primary: #333333;
-            --text-secondary: #666666;
-            --text-muted: #999999;
-            --border-color: #e5e5e5;
-            --bubble-mine: #fee500;
-            --bubble-mine-text: #3c1e1e;
-        }
-        .light-mode .mini-emoticon-inline {
-            background-color: rgba(0,0,0,0.08);
-        }
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
+            border-radius: 16px;
+            cursor: pointer;
+            transition: all 0.2s;
+            white-space: nowrap;
         }
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            background-color: #000;
-            min-height: 100vh;
-            min-height: 100dvh;
-            display: flex;
-            justify-content: center;
-            align-items: center;
+        .panel-category-btn:hover {
+            color: var(--text-secondary);
         }
-        .chat-container {
-            width: 100%;
-            max-width: 400px;
-            height: 100vh;
-            height: 100dvh;
-            background-color: var(--bg-primary);
-            display: flex;
-            flex-direction: column;
-            position: relative;
-            overflow: hidden;
+        .panel-category-btn.active {
+            background-color: #fff;
+            color: #000;
         }
-        .header {
-            background-color: var(--bg-secondary);
-            padding: 12px 16px;
+        .panel-tabs {
             display: flex;
             align-items: center;
+            padding: 0 12px 12px;
+            gap: 4px;
             border-bottom: 1px solid var(--border-color);
-            z-index: 10;
         }
-        .header-back {
-            width: 24px;
-            height: 24px;
+        .panel-tab {
+            width: 32px;
+            height: 32px;
+            border-radius: 8px;
+            border: none;
+            background: transparent;
+            color: var(--text-muted);
+            font-size: 12px;
+            cursor: pointer;
             display: flex;
             align-items: center;
             justify-content: center;
-            color: var(--text-primary);
-            cursor: pointer;
         }
-        .header-title {
-            font-size: 16px;
-            font-weight: 600;
+        .panel-tab:hover {
+            background-color: var(--bg-tertiary);
+        }
+        .panel-tab.active {
+            background-color: var(--bg-tertiary);
             color: var(--text-primary);
-            flex: 1;
-            text-align: center;
         }
-        .header-actions {
-            display: flex;
-            gap: 12px;
-            align-items: center;
+        .panel-tab-stacked {
+            flex-direction: column;
+            gap: 2px;
+            font-size: 10px;
+            line-height: 1;
         }
-        .badge {
-            background-color: var(--kakao-yellow);
-            color: var(--kakao-brown);
+        .panel-tab-all {
             padding: 4px 8px;
-            border-radius: 12px;
+            width: auto;
             font-size: 11px;
             font-weight: 600;
+            border: 1px solid var(--border-color);
         }
-        .mode-toggle {
-            width: 32px;
-            height: 32px;
-            border-radius: 50%;
-            background: var(--bg-tertiary);
-            border: none;
-            cursor: pointer;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: var(--text-primary);
-            font-size: 14px;
+        .panel-tab-divider {
+            width: 1px;
+            height: 20px;
+            background-color: var(--border-color);
+            margin: 0 4px;
         }
-        .chat-area {
-            flex: 1;
-            padding: 16px;
-            overflow-y: auto;
-            display: flex;
-            flex-direction: column;
-            gap: 8px;
+        .panel-tab-icon {
+            width: 28px;
+            height: 28px;
+            border-radius: 6px;
+            object-fit: cover;
         }
-        .download-banner {
+        .panel-title-row {
             display: flex;
-            justify-content: center;
-            padding: 12px;
+            align-items: center;
+            padding: 12px 16px 8px;
+            gap: 8px;
         }
-        .download-btn {
-            background-color: var(--kakao-yellow);
-            color: var(--kakao-brown);
-            padding: 10px 20px;
-            border-radius: 20px;
-            font-size: 13px;
+        .panel-icon-preview {
+            width: 32px;
+            height: 32px;
+            border-radius: 6px;
+            object-fit: cover;
+        }
+        .panel-title {
+            font-size: 14px;
             font-weight: 600;
-            text-decoration: none;
-            transition: all 0.2s;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.2);
+            color: var(--text-primary);
         }
-        .download-btn:hover {
-            transform: scale(1.05);
+        .panel-title-arrow {
+            color: var(--text-muted);
+            font-size: 12px;
         }
-        .message {
-            display: flex;
-            flex-direction: column;
-            align-items: flex-end;
-            max-width: 80%;
+        .panel-type-badge {
+            background-color: var(--bg-tertiary);
+            color: var(--text-secondary);
+            padding: 2px 8px;
+            border-radius: 4px;
+            font-size: 11px;
             margin-left: auto;
         }
-        .message-bubble {
-            background-color: var(--bubble-mine);
-            color: var(--bubble-mine-text);
-            padding: 10px 14px;
-            border-radius: 16px 16px 4px 16px;
-            font-size: 14px;
-            line-height: 1.4;
-            word-break: break-word;
+        .emoticon-grid {
+            display: grid;
+            grid-template-columns: repeat(4, 1fr);
+            gap: 4px;
+            padding: 8px 12px 16px;
+            overflow-y: auto;
+            flex: 1;
         }
-        .message-emoticon {
-            background: transparent;
+        .emoticon-grid.mini-grid {
+            grid-template-columns: repeat(6, 1fr);
+        }
+        .emoticon-grid.big-grid {
+            grid-template-columns: repeat(2, 1fr);
+        }
+        .emoticon-item {
+            aspect-ratio: 1;
+            background-color: transparent;
+            border-radius: 12px;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            padding: 8px;
+            cursor: pointer;
+            transition: all 0.15s;
+        }
+        .emoticon-item.mini-item {
+            aspect-ratio: auto;
+            height: 40px;
             padding: 4px;
+            border-radius: 8px;
         }
-        .message-emoticon img {
-            max-width: 120px;
-            max-height: 120px;
-            object-fit: contain;
+        .emoticon-item.big-item {
+            aspect-ratio: 1;
+            padding: 12px;
         }
-        .message-emoticon.big-emoticon img {
-            max-width: 240px;
-            max-height: 240px;
+        .emoticon-item:hover {
+            background-color: rgba(128, 128, 128, 0.2);
+            transform: scale(1.05);
         }
-        .message-time {
-            font-size: 10px;
-            color: var(--text-muted);
-            margin-top: 4px;
+        .emoticon-item:active {
+            transform: scale(0.95);
         }
-        .input-wrapper {
-            position: relative;
-            background-color: var(--bg-secondary);
-            border-top: 1px solid var(--border-color);
-            z-index: 100;
+        .emoticon-item img {
+            max-width: 100%;
+            max-height: 100%;
+            object-fit: contain;
         }
-        .input-bar {
+        .emoticon-item.mini-item img {
+            height: 32px;
+            width: auto;
+        }
+        /* 입력칸 내 미니 이모티콘 */
+        .input-mini-emoticons {
             display: flex;
+            flex-wrap: wrap;
+            gap: 2px;
             align-items: center;
-            padding: 8px 12px;
-            gap: 8px;
+            max-width: 100%;
         }
-        .input-btn {
-            width: 36px;
-            height: 36px;
-            border-radius: 50%;
-            border: none;
-            background-color: var(--bg-tertiary);
-            color: var(--text-secondary);
-            font-size: 20px;
+        .input-mini-item {
+            display: inline-flex;
+            align-items: center;
+            justify-content: center;
+            border-radius: 4px;
             cursor: pointer;
+            height: 24px;
+            overflow: hidden;
+        }
+        .input-mini-item img {
+            height: 100%;
+            width: auto;
+        }
+        .input-mini-item:hover {
+            opacity: 0.8;
+        }
+        /* 미니 이모티콘만 전송 시 (6개 이하) */
+        .message-mini-only {
+            display: flex;
+            flex-direction: column;
+            align-items: flex-end;
+            max-width: 80%;
+            margin-left: auto;
+        }
+        .mini-only-container {
+            display: flex;
+            flex-wrap: wrap;
+            gap: 4px;
+            justify-content: flex-end;
+            max-width: 260px;
+        }
+        .mini-only-item {
+            height: 40px;
             display: flex;
             align-items: center;
             justify-content: center;
-            flex-shrink: 0;
-            transition: all 0.2s;
         }
-        .input-btn:hover {
-            background-color: var(--border-color);
+        .mini-only-item img {
+            height: 100%;
+            width: auto;
         }
-        .input-field-wrapper {
-            flex: 1;
-            display: flex;
+        /* 말풍선 내 미니 이모티콘 (인라인) */
+        .mini-emoticon-inline {
+            display: inline-flex;
             align-items: center;
-            background-color: var(--bg-input);
-            border: 1px solid var(--border-color);
-            border-radius: 20px;
-            padding: 0 4px 0 14px;
-            min-height: 40px;
+            justify-content: center;
+            border-radius: 3px;
+            margin: 0 1px;
+            vertical-align: middle;
+            height: 18px;
         }
-        .input-field {
-            flex: 1;
-            border: none;
-            background: transparent;
-            color: var(--text-primary);
-            font-size: 14px;
-            outline: none;
-            padding: 8px 0;
-            min-width: 50px;
+        .mini-emoticon-inline img {
+            height: 100%;
+            width: auto;
         }
-        .input-field::placeholder {
-            color: var(--text-muted);
+        .selection-popup {
+            position: absolute;
+            bottom: 100%;
+            left: 50%;
+            transform: translateX(-50%);
+            margin-bottom: 8px;
+            background-color: rgba(0, 0, 0, 0.6);
+            border-radius: 16px;
+            padding: 12px;
+            display: none;
+            flex-direction: row;
+            align-items: flex-start;
+            gap: 8px;
+            z-index: 150;
         }
-        .input-field-wrapper.has-mini {
-            flex-wrap: wrap;
-            padding: 6px 4px 6px 10px;
-            gap: 4px;
+        .selection-popup.active {
+            display: flex;
         }
-        .emoji-btn {
-            width: 32px;
-            height: 32px;
+        .selection-star {
+            width: 28px;
+            height: 28px;
             border-radius: 50%;
             border: none;
             background: transparent;
-            color: var(--text-secondary);
-            font-size: 18px;
+            color: var(--text-muted);
+            font-size: 16px;
             cursor: pointer;
             display: flex;
-            align-items: center;
+            align-items: flex-start;
             justify-content: center;
+            padding-top: 4px;
         }
-        .emoji-btn:hover {
+        .selection-star.filled {
+            color: var(--kakao-yellow);
+        }
+        .selection-emoticon {
+            width: 100px;
+            height: 100px;
             background-color: var(--bg-tertiary);
+            border-radius: 16px;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            padding: 8px;
         }
-        .emoji-btn.active {
-            color: var(--kakao-yellow);
+        .selection-emoticon img {
+            max-width: 100%;
+            max-height: 100%;
+            object-fit: contain;
         }
-        .send-btn {
-            width: 36px;
-            height: 36px;
+        .selection-close {
+            width: 28px;
+            height: 28px;
             border-radius: 50%;
             border: none;
-            background-color: var(--bg-tertiary);
-            color: var(--text-secondary);
-            font-size: 16px;
+            background: transparent;
+            color: var(--text-muted);
+            font-size: 18px;
             cursor: pointer;
             display: flex;
-            align-items: center;
+            align-items: flex-start;
             justify-content: center;
-            flex-shrink: 0;
-            transition: all 0.2s;
+            padding-top: 4px;
         }
-        .send-btn.active {
-            background-color: var(--kakao-yellow);
-            color: var(--kakao-brown);
-        }
-        .emoticon-panel {
-            background-color: var(--bg-secondary);
-            border-radius: 16px 16px 0 0;
-            display: flex;
-            flex-direction: column;
-            max-height: 0;
-            overflow: hidden;
-            transition: max-height 0.3s ease-out;
-        }
-        .emoticon-panel.open {
-            max-height: 60vh;
+        .info-toggle {
+            padding: 8px 16px;
+            border-top: 1px solid var(--border-color);
         }
-        .panel-drag-handle {
-            padding: 12px;
-            display: flex;
-            justify-content: center;
-            cursor: grab;
+        .info-toggle-btn {
+            width: 100%;
+            padding: 8px;
+            border: none;
+            background: var(--bg-tertiary);
+            color: var(--text-secondary);
+            font-size: 12px;
+            border-radius: 8px;
+            cursor: pointer;
         }
-        .panel-drag-handle:active {
-            cursor: grabbing;
+        .info-section {
+            padding: 12px 16px;
+            background-color: var(--bg-tertiary);
+            border-top: 1px solid var(--border-color);
+            display: none;
         }
-        .panel-drag-bar {
-            width: 40px;
-            height: 4px;
-            background-color: var(--border-color);
-            border-radius: 2px;
+        .info-section.open {
+            display: block;
         }
-        .panel-category-bar {
+        .info-row {
             display: flex;
-            align-items: center;
-            justify-content: center;
-            margin: 0 12px 12px;
-            padding: 4px;
-            background-color: var(--bg-tertiary);
-            border-radius: 20px;
-            gap: 2px;
-            width: fit-content;
+            justify-content: space-between;
+            margin-bottom: 6px;
         }
-        .panel-category-btn {
-            padding: 6px 12px;
-            border: none;
-            background: transparent;
+        .info-row:last-child {
+            margin-bottom: 0;
+        }
+        .info-label {
             color: var(--text-muted);
             font-size: 12px;
-            border-radius: 16px;
-            cursor: pointer;
-            transition: all 0.2s;
-            white-space: nowrap;
         }
-        .panel-category-btn:hover {
-            color: var(--text-secondary);
+        .info-value {
+            color: var(--text-primary);
+            font-size: 12px;
+            font-weight: 500;
         }
-        .panel-category-btn.active {
-            background-color: #fff;
-            color: #000;
+"""
+
+# after-preview 정적 JS (/static 경로로 분리 제공, 브라우저 캐시 활용)
+_AFTER_JS = """
+        const chatContainer = document.getElementById('chatContainer');
+        const chatArea = document.getElementById('chatArea');
+        const inputWrapper = document.getElementById('inputWrapper');
+        const messageInput = document.getElementById('messageInput');
+        const sendBtn = document.getElementById('sendBtn');
+        const emojiBtn = document.getElementById('emojiBtn');
+        const emoticonPanel = document.getElementById('emoticonPanel');
+        const dragHandle = document.getElementById('dragHandle');
+        const emoticonGrid = document.getElementById('emoticonGrid');
+        const selectionPopup = document.getElementById('selectionPopup');
+        const selectionImage = document.getElementById('selectionImage');
+        const selectionStar = document.getElementById('selectionStar');
+        const modeToggle = document.getElementById('modeToggle');
+        const infoToggleBtn = document.getElementById('infoToggleBtn');
+        const infoSection = document.getElementById('infoSection');
+        const inputFieldWrapper = document.getElementById('inputFieldWrapper');
+        const inputMiniEmoticons = document.getElementById('inputMiniEmoticons');
+        
+        let isPanelOpen = false;
+        let selectedEmoticon = null;
+        let isStarred = false;
+        let isDragging = false;
+        let startY = 0;
+        let panelHeight = 0;
+
+        // 입력칸에 추가된 미니 이모티콘 목록
+        let miniEmoticons = [];
+        // 메시지 시각 포맷터 (메시지마다 새로 만들지 않도록 한 번만 생성)
+        const timeFormat = new Intl.DateTimeFormat('ko-KR', { hour: '2-digit', minute: '2-digit' });
+        
+        // Update send button state
+        function updateSendButton() {
+            if (messageInput.value.trim() || selectedEmoticon || miniEmoticons.length > 0) {
+                sendBtn.classList.add('active');
+                sendBtn.innerHTML = '<svg width="18" height="18" viewBox="0 0 24 24" fill="currentColor"><path d="M2.01 21L23 12 2.01 3 2 10l15 2-15 2z"/></svg>';
+            } else {
+                sendBtn.classList.remove('active');
+                sendBtn.textContent = '#';
+            }
         }
-        .panel-tabs {
-            display: flex;
-            align-items: center;
-            padding: 0 12px 12px;
-            gap: 4px;
-            border-bottom: 1px solid var(--border-color);
+        
+        messageInput.addEventListener('input', updateSendButton);
+        
+        // 미니 이모티콘 입력칸 UI 업데이트
+        function updateMiniInput() {
+            if (miniEmoticons.length === 0) {
+                inputMiniEmoticons.style.display = 'none';
+                inputFieldWrapper.classList.remove('has-mini');
+            } else {
+                inputMiniEmoticons.style.display = 'flex';
+                inputFieldWrapper.classList.add('has-mini');
+                inputMiniEmoticons.innerHTML = miniEmoticons.map((e, i) => 
+                    `<span class="input-mini-item" data-mini-index="${i}"><img src="${e.src}" alt=""></span>`
+                ).join('');
+            }
+            updateSendButton();
         }
-        .panel-tab {
-            width: 32px;
-            height: 32px;
-            border-radius: 8px;
-            border: none;
-            background: transparent;
-            color: var(--text-muted);
-            font-size: 12px;
-            cursor: pointer;
-            display: flex;
-            align-items: center;
-            justify-content: center;
+        
+        // 미니 이모티콘 입력칸에서 클릭 시 제거
+        inputMiniEmoticons.addEventListener('click', (e) => {
+            const item = e.target.closest('.input-mini-item');
+            if (!item) return;
+            const idx = parseInt(item.dataset.miniIndex);
+            miniEmoticons.splice(idx, 1);
+            updateMiniInput();
+        });
+        
+        // Send message or emoticon
+        function sendMessage() {
+            if (selectedEmoticon && !isMini) {
+                addMessage('', 'emoticon', selectedEmoticon.src);
+                closeSelection();
+                return;
+            }
+            
+            const text = messageInput.value.trim();
+            
+            // 미니 이모티콘 처리
+            if (isMini && miniEmoticons.length > 0) {
+                if (text === '' && miniEmoticons.length <= 6) {
+                    // 미니 이모티콘만 6개 이하: 말풍선 없이 가로로 배치
+                    addMiniOnlyMessage(miniEmoticons);
+                } else {
+                    // 텍스트와 섞여있거나 7개 이상: 말풍선 안에 인라인으로
+                    addMixedMessage(text, miniEmoticons);
+                }
+                miniEmoticons = [];
+                messageInput.value = '';
+                updateMiniInput();
+                return;
+            }
+            
+            if (!text) return;
+            
+            addMessage(text, 'text');
+            messageInput.value = '';
+            updateSendButton();
         }
-        .panel-tab:hover {
-            background-color: var(--bg-tertiary);
+        
+        messageInput.addEventListener('keypress', (e) => {
+            if (e.key === 'Enter') {
+                sendMessage();
+            }
+        });
+        
+        // 메시지는 프레임 단위로 모아 한 번에 추가 (메시지마다 스크롤 위치 계산으로 리플로우하지 않음)
+        const pendingMessages = [];
+        let flushScheduled = false;
+        // 채팅 영역에 유지할 최대 메시지 수 (오래된 메시지부터 제거하여 DOM 크기 제한)
+        const MAX_VISIBLE_MESSAGES = 50;
+        const visibleMessages = [];
+        
+        function appendMessage(message) {
+            pendingMessages.push(message);
+            if (flushScheduled) return;
+            flushScheduled = true;
+            requestAnimationFrame(flushMessages);
+        }
+        
+        function flushMessages() {
+            flushScheduled = false;
+            const frag = document.createDocumentFragment();
+            for (const message of pendingMessages) {
+                frag.appendChild(message);
+                visibleMessages.push(message);
+            }
+            pendingMessages.length = 0;
+            chatArea.appendChild(frag);
+            // 메시지가 아닌 고정 요소(다운로드 배너 등)는 유지
+            while (visibleMessages.length > MAX_VISIBLE_MESSAGES) {
+                visibleMessages.shift().remove();
+            }
+            chatArea.scrollTop = chatArea.scrollHeight;
         }
-        .panel-tab.active {
-            background-color: var(--bg-tertiary);
-            color: var(--text-primary);
+        
+        // 요소를 DOM API로 직접 생성 (HTML 문자열 파싱/이스케이프 없음, 텍스트는 textContent로 안전하게 설정)
+        function createEl(tag, className, text) {
+            const el = document.createElement(tag);
+            el.className = className;
+            if (text !== undefined) el.textContent = text;
+            return el;
         }
-        .panel-tab-stacked {
-            flex-direction: column;
-            gap: 2px;
-            font-size: 10px;
-            line-height: 1;
+        
+        function createMessageTime() {
+            return createEl('span', 'message-time', timeFormat.format(new Date()));
         }
-        .panel-tab-all {
-            padding: 4px 8px;
-            width: auto;
-            font-size: 11px;
-            font-weight: 600;
-            border: 1px solid var(--border-color);
+        
+        function createImg(src, alt) {
+            const img = new Image();
+            img.src = src;
+            img.alt = alt;
+            return img;
         }
-        .panel-tab-divider {
-            width: 1px;
-            height: 20px;
-            background-color: var(--border-color);
-            margin: 0 4px;
+        
+        // 미니 이모티콘만 전송 (6개 이하)
+        function addMiniOnlyMessage(emojis) {
+            const message = createEl('div', 'message-mini-only');
+            const container = createEl('div', 'mini-only-container');
+            for (const e of emojis) {
+                const item = createEl('div', 'mini-only-item');
+                item.appendChild(createImg(e.src, ''));
+                container.appendChild(item);
+            }
+            message.append(container, createMessageTime());
+            appendMessage(message);
+        }
+        
+        // 텍스트와 미니 이모티콘 혼합 메시지
+        function addMixedMessage(text, emojis) {
+            const message = createEl('div', 'message');
+            const bubble = createEl('div', 'message-bubble', text);
+            // 미니 이모티콘을 인라인으로 표시
+            for (const e of emojis) {
+                const inline = createEl('span', 'mini-emoticon-inline');
+                inline.appendChild(createImg(e.src, ''));
+                bubble.appendChild(inline);
+            }
+            message.append(bubble, createMessageTime());
+            appendMessage(message);
+        }
+        
+        // Add message to chat
+        function addMessage(content, type, imageSrc = '') {
+            const message = createEl('div', 'message');
+            let bubble;
+            
+            if (type === 'text') {
+                bubble = createEl('div', 'message-bubble', content);
+            } else if (type === 'emoticon') {
+                const bigClass = isBig ? ' big-emoticon' : '';
+                bubble = createEl('div', 'message-bubble message-emoticon' + bigClass);
+                bubble.appendChild(createImg(imageSrc, '이모티콘'));
+            }
+            
+            message.append(bubble, createMessageTime());
+            appendMessage(message);
+        }
+        
+        // Toggle emoticon panel
+        function togglePanel() {
+            isPanelOpen = !isPanelOpen;
+            emoticonPanel.classList.toggle('open', isPanelOpen);
+            emojiBtn.classList.toggle('active', isPanelOpen);
+            
+            if (!isPanelOpen) {
+                emoticonPanel.style.maxHeight = '';
+                closeSelection();
+            }
+        }
+        
+        // Emoticon selection
+        emoticonGrid.addEventListener('click', (e) => {
+            const item = e.target.closest('.emoticon-item');
+            if (!item || !emoticonGrid.contains(item)) return;
+            // 그리드 하나의 리스너에서 처리하므로 항목 정보는 클릭 시에만 읽음
+            const emoticon = {
+                index: item.dataset.index,
+                src: item.querySelector('img').dataset.src
+            };
+            
+            if (isMini) {
+                // 미니 이모티콘: 입력칸에 추가
+                miniEmoticons.push(emoticon);
+                updateMiniInput();
+                return;
+            }
+            
+            selectedEmoticon = emoticon;
+            
+            selectionImage.src = selectedEmoticon.src;
+            selectionPopup.classList.add('active');
+            isStarred = false;
+            selectionStar.textContent = '☆';
+            selectionStar.classList.remove('filled');
+            updateSendButton();
+        });
+        
+        function closeSelection() {
+            selectionPopup.classList.remove('active');
+            selectedEmoticon = null;
+            updateSendButton();
+        }
+        
+        // Selection popup controls
+        function toggleStar() {
+            isStarred = !isStarred;
+            selectionStar.textContent = isStarred ? '★' : '☆';
+            selectionStar.classList.toggle('filled', isStarred);
         }
-        .panel-tab-icon {
-            width: 28px;
-            height: 28px;
-            border-radius: 6px;
-            object-fit: cover;
+        
+        // Drag handle for panel resize
+        dragHandle.addEventListener('mousedown', startDrag);
+        // touchstart에서는 preventDefault를 호출하지 않으므로 passive로 등록 (스크롤 차단 없음)
+        dragHandle.addEventListener('touchstart', startDrag, { passive: true });
+        
+        function startDrag(e) {
+            isDragging = true;
+            startY = e.type === 'mousedown' ? e.clientY : e.touches[0].clientY;
+            panelHeight = emoticonPanel.offsetHeight;
+            document.addEventListener('mousemove', onDrag);
+            document.addEventListener('mouseup', stopDrag);
+            document.addEventListener('touchmove', onDrag, { passive: false });
+            document.addEventListener('touchend', stopDrag);
         }
-        .panel-title-row {
-            display: flex;
-            align-items: center;
-            padding: 12px 16px 8px;
-            gap: 8px;
+        
+        function onDrag(e) {
+            if (!isDragging) return;
+            e.preventDefault();
+            const clientY = e.type === 'mousemove' ? e.clientY : e.touches[0].clientY;
+            const delta = startY - clientY;
+            const newHeight = Math.min(Math.max(panelHeight + delta, 200), window.innerHeight * 0.8);
+            emoticonPanel.style.maxHeight = newHeight + 'px';
         }
-        .panel-icon-preview {
-            width: 32px;
-            height: 32px;
-            border-radius: 6px;
-            object-fit: cover;
+        
+        function stopDrag() {
+            isDragging = false;
+            document.removeEventListener('mousemove', onDrag);
+            document.removeEventListener('mouseup', stopDrag);
+            document.removeEventListener('touchmove', onDrag);
+            document.removeEventListener('touchend', stopDrag);
         }
-        .panel-title {
-            font-size: 14px;
-            font-weight: 600;
-            color: var(--text-primary);
+        
+        // Mode toggle
+        function toggleMode() {
+            chatContainer.classList.toggle('light-mode');
+            modeToggle.textContent = chatContainer.classList.contains('light-mode') ? '☀️' : '🌙';
         }
-        .panel-title-arrow {
-            color: var(--text-muted);
-            font-size: 12px;
+        
+        // Info toggle
+        function toggleInfo() {
+            const isOpen = infoSection.classList.toggle('open');
+            infoToggleBtn.textContent = isOpen ? '상세 정보 닫기 ▲' : '상세 정보 보기 ▼';
         }
-        .panel-type-badge {
-            background-color: var(--bg-tertiary);
-            color: var(--text-secondary);
-            padding: 2px 8px;
-            border-radius: 4px;
-            font-size: 11px;
-            margin-left: auto;
+        
+        // 버튼 클릭은 컨테이너의 리스너 하나에서 data-action으로 분기
+        const clickActions = {
+            send: sendMessage,
+            togglePanel: togglePanel,
+            closeSelection: closeSelection,
+            toggleStar: toggleStar,
+            toggleMode: toggleMode,
+            toggleInfo: toggleInfo
+        };
+        chatContainer.addEventListener('click', (e) => {
+            const target = e.target.closest('[data-action]');
+            if (!target) return;
+            const action = clickActions[target.dataset.action];
+            if (action) action();
+        });
+        
+        // 이모티콘 이미지는 화면에 보일 때만 로드 (패널을 열기 전에는 디코딩하지 않음)
+        const lazyImages = emoticonGrid.querySelectorAll('img[data-src]');
+        if ('IntersectionObserver' in window) {
+            const imageObserver = new IntersectionObserver((entries) => {
+                for (const entry of entries) {
+                    if (entry.isIntersecting) {
+                        entry.target.src = entry.target.dataset.src;
+                        imageObserver.unobserve(entry.target);
+                    }
+                }
+            }, { rootMargin: '200px' });
+            lazyImages.forEach(img => imageObserver.observe(img));
+        } else {
+            lazyImages.forEach(img => { img.src = img.dataset.src; });
         }
-        .emoticon-grid {
-            display: grid;
-            grid-template-columns: repeat(4, 1fr);
-            gap: 4px;
-            padding: 8px 12px 16px;
-            overflow-y: auto;
-            flex: 1;
+"""
+
+# 상태 페이지 정적 CSS (/static 경로로 분리 제공, 브라우저 캐시 활용)
+_STATUS_CSS = """
+        :root {
+            --bg-primary: #1a1a1a;
+            --bg-secondary: #2a2a2a;
+            --text-primary: #ffffff;
+            --text-secondary: #999999;
+            --kakao-yellow: #fee500;
+            --success-green: #4ade80;
+            --error-red: #f87171;
         }
-        .emoticon-grid.mini-grid {
-            grid-template-columns: repeat(6, 1fr);
+        * {
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
         }
-        .emoticon-grid.big-grid {
-            grid-template-columns: repeat(2, 1fr);
+        [hidden] {
+            display: none !important;
         }
-        .emoticon-item {
-            aspect-ratio: 1;
-            background-color: transparent;
-            border-radius: 12px;
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            background-color: var(--bg-primary);
+            color: var(--text-primary);
+            min-height: 100vh;
             display: flex;
-            align-items: center;
             justify-content: center;
-            padding: 8px;
-            cursor: pointer;
-            transition: all 0.15s;
-        }
-        .emoticon-item.mini-item {
-            aspect-ratio: auto;
-            height: 40px;
-            padding: 4px;
-            border-radius: 8px;
-        }
-        .emoticon-item.big-item {
-            aspect-ratio: 1;
-            padding: 12px;
+            align-items: center;
+            padding: 20px;
         }
-        .emoticon-item:hover {
-            background-color: rgba(128, 128, 128, 0.2);
-            transform: scale(1.05);
+        .container {
+            width: 100%;
+            max-width: 500px;
+            background-color: var(--bg-secondary);
+            border-radius: 20px;
+            padding: 32px;
+            box-shadow: 0 4px 20px rgba(0,0,0,0.3);
         }
-        .emoticon-item:active {
-            transform: scale(0.95);
+        .header {
+            text-align: center;
+            margin-bottom: 32px;
         }
-        .emoticon-item img {
-            max-width: 100%;
-            max-height: 100%;
-            object-fit: contain;
+        .header h1 {
+            font-size: 24px;
+            margin-bottom: 8px;
         }
-        .emoticon-item.mini-item img {
-            height: 32px;
-            width: auto;
+        .header .task-id {
+            font-size: 12px;
+            color: var(--text-secondary);
+            font-family: monospace;
         }
-        /* 입력칸 내 미니 이모티콘 */
-        .input-mini-emoticons {
-            display: flex;
-            flex-wrap: wrap;
-            gap: 2px;
-            align-items: center;
-            max-width: 100%;
+        .status-badge {
+            display: inline-block;
+            padding: 6px 16px;
+            border-radius: 20px;
+            font-size: 14px;
+            font-weight: 600;
+            margin: 16px 0;
         }
-        .input-mini-item {
-            display: inline-flex;
-            align-items: center;
-            justify-content: center;
-            border-radius: 4px;
-            cursor: pointer;
-            height: 24px;
-            overflow: hidden;
+        .status-pending {
+            background-color: var(--text-secondary);
+            color: #000;
         }
-        .input-mini-item img {
-            height: 100%;
-            width: auto;
+        .status-running {
+            background-color: var(--kakao-yellow);
+            color: #000;
         }
-        .input-mini-item:hover {
-            opacity: 0.8;
+        .status-completed {
+            background-color: var(--success-green);
+            color: #000;
         }
-        /* 미니 이모티콘만 전송 시 (6개 이하) */
-        .message-mini-only {
-            display: flex;
-            flex-direction: column;
-            align-items: flex-end;
-            max-width: 80%;
-            margin-left: auto;
+        .status-failed {
+            background-color: var(--error-red);
+            color: #000;
         }
-        .mini-only-container {
-            display: flex;
-            flex-wrap: wrap;
-            gap: 4px;
-            justify-content: flex-end;
-            max-width: 260px;
+        .progress-section {
+            margin: 24px 0;
         }
-        .mini-only-item {
-            height: 40px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
+        .progress-bar-container {
+            background-color: var(--bg-primary);
+            border-radius: 10px;
+            height: 20px;
+            overflow: hidden;
+            margin-bottom: 12px;
         }
-        .mini-only-item img {
+        .progress-bar {
             height: 100%;
-            width: auto;
-        }
-        /* 말풍선 내 미니 이모티콘 (인라인) */
-        .mini-emoticon-inline {
-            display: inline-flex;
+            background: linear-gradient(90deg, var(--kakao-yellow), #ffd000);
+            border-radius: 10px;
+            transition: width 0.5s ease;
+            display: flex;
             align-items: center;
             justify-content: center;
-            border-radius: 3px;
-            margin: 0 1px;
-            vertical-align: middle;
-            height: 18px;
         }
-        .mini-emoticon-inline img {
-            height: 100%;
-            width: auto;
+        .progress-bar span {
+            font-size: 11px;
+            font-weight: 600;
+            color: #000;
         }
-        .selection-popup {
-            position: absolute;
-            bottom: 100%;
-            left: 50%;
-            transform: translateX(-50%);
-            margin-bottom: 8px;
-            background-color: rgba(0, 0, 0, 0.6);
-            border-radius: 16px;
-            padding: 12px;
-            display: none;
-            flex-direction: row;
-            align-items: flex-start;
-            gap: 8px;
-            z-index: 150;
+        .progress-text {
+            display: flex;
+            justify-content: space-between;
+            font-size: 14px;
+            color: var(--text-secondary);
         }
-        .selection-popup.active {
-            display: flex;
+        .current-task {
+            text-align: center;
+            padding: 16px;
+            background-color: var(--bg-primary);
+            border-radius: 12px;
+            margin: 16px 0;
         }
-        .selection-star {
-            width: 28px;
-            height: 28px;
-            border-radius: 50%;
-            border: none;
-            background: transparent;
-            color: var(--text-muted);
+        .current-task-label {
+            font-size: 12px;
+            color: var(--text-secondary);
+            margin-bottom: 8px;
+        }
+        .current-task-desc {
             font-size: 16px;
-            cursor: pointer;
-            display: flex;
-            align-items: flex-start;
-            justify-content: center;
-            padding-top: 4px;
+            color: var(--text-primary);
         }
-        .selection-star.filled {
-            color: var(--kakao-yellow);
+        .emoticon-grid {
+            display: grid;
+            grid-template-columns: repeat(4, 1fr);
+            gap: 8px;
+            margin-top: 24px;
+            max-height: 300px;
+            overflow-y: auto;
         }
-        .selection-emoticon {
-            width: 100px;
-            height: 100px;
-            background-color: var(--bg-tertiary);
-            border-radius: 16px;
+        .emoticon-item {
+            aspect-ratio: 1;
+            background-color: var(--bg-primary);
+            border-radius: 12px;
             display: flex;
             align-items: center;
             justify-content: center;
-            padding: 8px;
+            overflow: hidden;
         }
-        .selection-emoticon img {
+        .emoticon-item img {
             max-width: 100%;
             max-height: 100%;
             object-fit: contain;
         }
-        .selection-close {
-            width: 28px;
-            height: 28px;
+        .emoticon-item.pending {
+            opacity: 0.3;
+        }
+        .emoticon-item.pending::after {
+            content: '';
+            width: 24px;
+            height: 24px;
+            border: 2px solid var(--text-secondary);
             border-radius: 50%;
-            border: none;
-            background: transparent;
-            color: var(--text-muted);
-            font-size: 18px;
-            cursor: pointer;
-            display: flex;
-            align-items: flex-start;
-            justify-content: center;
-            padding-top: 4px;
         }
-        .info-toggle {
-            padding: 8px 16px;
-            border-top: 1px solid var(--border-color);
+        .instructions {
+            margin-top: 24px;
+            padding: 16px;
+            background-color: rgba(254, 229, 0, 0.1);
+            border: 1px solid rgba(254, 229, 0, 0.3);
+            border-radius: 12px;
         }
-        .info-toggle-btn {
-            width: 100%;
-            padding: 8px;
-            border: none;
-            background: var(--bg-tertiary);
+        .instructions h3 {
+            font-size: 14px;
+            color: var(--kakao-yellow);
+            margin-bottom: 8px;
+        }
+        .instructions p {
+            font-size: 13px;
             color: var(--text-secondary);
+            line-height: 1.5;
+        }
+        .instructions code {
+            background-color: var(--bg-primary);
+            padding: 2px 6px;
+            border-radius: 4px;
+            font-family: monospace;
             font-size: 12px;
-            border-radius: 8px;
-            cursor: pointer;
+            color: var(--kakao-yellow);
         }
-        .info-section {
-            padding: 12px 16px;
-            background-color: var(--bg-tertiary);
-            border-top: 1px solid var(--border-color);
-            display: none;
+        .error-message {
+            margin-top: 16px;
+            padding: 16px;
+            background-color: rgba(248, 113, 113, 0.1);
+            border: 1px solid rgba(248, 113, 113, 0.3);
+            border-radius: 12px;
+            color: var(--error-red);
+            font-size: 14px;
         }
-        .info-section.open {
-            display: block;
+        .result-section {
+            margin-top: 24px;
+            text-align: center;
         }
-        .info-row {
-            display: flex;
-            justify-content: space-between;
-            margin-bottom: 6px;
+        .result-section h3 {
+            font-size: 18px;
+            color: var(--success-green);
+            margin-bottom: 16px;
         }
-        .info-row:last-child {
-            margin-bottom: 0;
+        .spinner {
+            display: inline-block;
+            width: 40px;
+            height: 40px;
+            border: 3px solid var(--bg-primary);
+            border-top-color: var(--kakao-yellow);
+            border-radius: 50%;
+            animation: spin 1s linear infinite;
+            /* 회전을 컴포지터 레이어에서 처리하여 폴링 중 메인 스레드 리페인트 방지 */
+            will-change: transform;
+            margin: 16px 0;
         }
-        .info-label {
-            color: var(--text-muted);
-            font-size: 12px;
+        /* 숨겨진 영역의 스피너는 애니메이션 정지 */
+        [hidden] .spinner,
+        .spinner[hidden] {
+            animation-play-state: paused;
         }
-        .info-value {
-            color: var(--text-primary);
+        @keyframes spin {
+            to { transform: rotate(360deg); }
+        }
+        .refresh-note {
             font-size: 12px;
-            font-weight: 500;
+            color: var(--text-secondary);
+            margin-top: 16px;
         }
-    </style>
+"""
+
+
+# before-preview 페이지 조각 (기획 단계)
+# Jinja 대신 str.format으로 조립 (접두부 + 기획 항목 반복 + 접미부)
+BEFORE_PREVIEW_PREFIX = """
+<!DOCTYPE html>
+<html lang="ko">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=1.0, user-scalable=no">
+    <title>{title} - 이모티콘 기획 프리뷰</title>
+    <style>{css}</style>
 </head>
 <body>
     <div class="chat-container light-mode" id="chatContainer">
@@ -2006,35 +2144,32 @@ AFTER_PREVIEW_TEMPLATE = """
                     <path d="M15 18l-6-6 6-6"/>
                 </svg>
             </div>
-            <div class="header-title">{{ title }}</div>
+            <div class="header-title">{title}</div>
             <div class="header-actions">
-                <span class="badge">완성</span>
-                <button class="mode-toggle" id="modeToggle" title="다크/라이트 모드 전환">☀️</button>
+                <span class="badge">기획</span>
+                <button class="mode-toggle" id="modeToggle" data-action="toggleMode" title="다크/라이트 모드 전환">☀️</button>
             </div>
         </div>
         
-        <div class="chat-area" id="chatArea">
-            <div class="download-banner">
-                <a href="{{ download_url }}" class="download-btn" download>ZIP 다운로드</a>
-            </div>
-        </div>
+        <div class="chat-area" id="chatArea"></div>
         
         <div class="input-wrapper" id="inputWrapper">
             <div class="selection-popup" id="selectionPopup">
-                <button class="selection-star" id="selectionStar">☆</button>
+                <button class="selection-star" id="selectionStar" data-action="toggleStar">☆</button>
                 <div class="selection-emoticon" id="selectionEmoticon">
-                    <img src="" alt="" id="selectionImage">
+                    <span class="selection-emoticon-number" id="selectionNumber"></span>
+                    <span class="selection-emoticon-desc" id="selectionDesc"></span>
                 </div>
-                <button class="selection-close" id="selectionClose">✕</button>
+                <button class="selection-close" id="selectionClose" data-action="closeSelection">✕</button>
             </div>
             <div class="input-bar">
                 <button class="input-btn" id="addBtn">+</button>
                 <div class="input-field-wrapper" id="inputFieldWrapper">
                     <div class="input-mini-emoticons" id="inputMiniEmoticons" style="display: none;"></div>
                     <input type="text" class="input-field" id="messageInput" placeholder="메시지 입력">
-                    <button class="emoji-btn" id="emojiBtn">☺︎</button>
+                    <button class="emoji-btn" id="emojiBtn" data-action="togglePanel">☺︎</button>
                 </div>
-                <button class="send-btn" id="sendBtn">#</button>
+                <button class="send-btn" id="sendBtn" data-action="send">#</button>
             </div>
         </div>
         
@@ -2045,339 +2180,718 @@ AFTER_PREVIEW_TEMPLATE = """
             
             <div class="panel-category-bar">
                 <button class="panel-category-btn">검색</button>
-                <button class="panel-category-btn{% if not is_mini %} active{% endif %}" data-category="emoticon">이모티콘</button>
-                <button class="panel-category-btn{% if is_mini %} active{% endif %}" data-category="mini">미니 이모티콘</button>
+                <button class="panel-category-btn{emoticon_active}" data-category="emoticon">이모티콘</button>
+                <button class="panel-category-btn{mini_active}" data-category="mini">미니 이모티콘</button>
             </div>
             
             <div class="panel-tabs">
                 <button class="panel-tab panel-tab-stacked"><span>○</span><span>☆</span></button>
                 <div class="panel-tab-divider"></div>
                 <button class="panel-tab panel-tab-all">ALL</button>
-                {% if icon %}
-                <button class="panel-tab active" id="emoticonTabBtn">
-                    <img src="{{ icon }}" alt="" class="panel-tab-icon">
-                </button>
-                {% else %}
                 <button class="panel-tab active" id="emoticonTabBtn">☺︎</button>
-                {% endif %}
             </div>
             
             <div class="panel-title-row">
-                {% if icon %}
-                <img src="{{ icon }}" alt="" class="panel-icon-preview">
-                {% endif %}
-                <span class="panel-title">{{ title }}</span>
+                <span class="panel-title">{title}</span>
                 <span class="panel-title-arrow">›</span>
-                <span class="panel-type-badge">{{ emoticon_type_name }}</span>
+                <span class="panel-type-badge">{type_name}</span>
             </div>
             
-            <div class="emoticon-grid{% if is_mini %} mini-grid{% elif is_big %} big-grid{% endif %}" id="emoticonGrid">
-                {% for emoticon in emoticons %}
-                <div class="emoticon-item{% if is_mini %} mini-item{% elif is_big %} big-item{% endif %}" data-index="{{ loop.index }}" data-src="{{ emoticon.image_data }}">
-                    <img src="{{ emoticon.image_data }}" alt="이모티콘 {{ loop.index }}">
+            <div class="emoticon-grid{grid_class}" id="emoticonGrid">
+"""
+
+BEFORE_PREVIEW_ITEM = """                <div class="emoticon-item{item_class}" data-index="{index}" data-desc="{desc}">
+                    <span class="emoticon-number">{index}</span>
+                    <span class="emoticon-desc">{desc}</span>
                 </div>
-                {% endfor %}
-            </div>
+"""
+
+BEFORE_PREVIEW_SUFFIX = """            </div>
             
             <div class="info-toggle">
-                <button class="info-toggle-btn" id="infoToggleBtn">상세 정보 보기 ▼</button>
+                <button class="info-toggle-btn" id="infoToggleBtn" data-action="toggleInfo">상세 정보 보기 ▼</button>
             </div>
             
             <div class="info-section" id="infoSection">
                 <div class="info-row">
                     <span class="info-label">이모티콘 타입</span>
-                    <span class="info-value">{{ emoticon_type_name }}</span>
+                    <span class="info-value">{type_name}</span>
+                </div>
+                <div class="info-row">
+                    <span class="info-label">총 개수</span>
+                    <span class="info-value">{count} / {spec_count}개</span>
+                </div>
+                <div class="info-row">
+                    <span class="info-label">파일 형식</span>
+                    <span class="info-value">{format}</span>
+                </div>
+                <div class="info-row">
+                    <span class="info-label">크기</span>
+                    <span class="info-value">{width} x {height} px</span>
+                </div>
+            </div>
+        </div>
+    </div>
+    
+
+    
+    <script>
+        // 미니 이모티콘 여부
+        const isMini = {is_mini};
+        // 큰 이모티콘 여부
+        const isBig = {is_big};
+    </script>
+    <script src="{js_url}"></script>
+</body>
+</html>
+"""
+
+# status page 템플릿 (진행 상황)
+# 치환 항목이 {{ task_id }}, {{ css_url }}뿐이라 Jinja 없이 조각으로 나눠 조립
+STATUS_PAGE_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="ko">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>이모티콘 생성 중...</title>
+    <link rel="stylesheet" href="{{ css_url }}">
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>이모티콘 생성</h1>
+            <div class="task-id">작업 ID: {{ task_id }}</div>
+        </div>
+        
+        <div id="statusContent">
+            <div id="loadingSection" style="text-align: center;">
+                <div class="spinner"></div>
+                <p>로딩 중...</p>
+            </div>
+            
+            <!-- 모든 영역을 미리 그려두고 상태에 따라 표시/숨김 및 텍스트만 갱신 -->
+            <div id="statusSection" hidden>
+                <div style="text-align: center;">
+                    <span class="status-badge" id="statusBadge"></span>
+                </div>
+                
+                <div id="progressGroup" hidden>
+                    <div class="progress-section">
+                        <div class="progress-bar-container">
+                            <div class="progress-bar" id="progressBar" style="width: 0%">
+                                <span id="progressPercent">0%</span>
+                            </div>
+                        </div>
+                        <div class="progress-text">
+                            <span id="progressText"></span>
+                            <span id="progressType"></span>
+                        </div>
+                    </div>
+                    <div class="current-task" id="currentTask" hidden>
+                        <div class="current-task-label">현재 작업</div>
+                        <div class="current-task-desc" id="currentTaskDesc"></div>
+                    </div>
+                    <div class="spinner" style="margin: 24px auto; display: block;"></div>
+                    <p class="refresh-note">페이지가 자동으로 업데이트됩니다...</p>
+                </div>
+                
+                <div id="resultSection" hidden>
+                    <div class="result-section">
+                        <h3>✅ 생성 완료!</h3>
+                        <p>이제 AI에게 작업 ID를 전달하여 결과를 확인하세요.</p>
+                    </div>
+                    <div class="instructions">
+                        <h3>다음 단계</h3>
+                        <p>AI에게 다음 메시지를 보내세요:</p>
+                        <p style="margin-top: 8px;"><code>이모티콘 생성 완료! 작업 ID: {{ task_id }}</code></p>
+                    </div>
                 </div>
-                <div class="info-row">
-                    <span class="info-label">총 개수</span>
-                    <span class="info-value">{{ emoticons|length }}개</span>
+                
+                <div id="errorSection" hidden>
+                    <div class="error-message">
+                        <strong>오류 발생:</strong> <span id="errorMessage"></span>
+                    </div>
+                    <div class="instructions">
+                        <h3>해결 방법</h3>
+                        <p>AI에게 다시 생성을 요청해보세요.</p>
+                    </div>
                 </div>
+                
+                <div class="emoticon-grid" id="emoticonGrid" hidden></div>
             </div>
         </div>
     </div>
     
     <script>
-        const chatContainer = document.getElementById('chatContainer');
-        const chatArea = document.getElementById('chatArea');
-        const inputWrapper = document.getElementById('inputWrapper');
-        const messageInput = document.getElementById('messageInput');
-        const sendBtn = document.getElementById('sendBtn');
-        const emojiBtn = document.getElementById('emojiBtn');
-        const emoticonPanel = document.getElementById('emoticonPanel');
-        const dragHandle = document.getElementById('dragHandle');
-        const emoticonGrid = document.getElementById('emoticonGrid');
-        const selectionPopup = document.getElementById('selectionPopup');
-        const selectionImage = document.getElementById('selectionImage');
-        const selectionStar = document.getElementById('selectionStar');
-        const selectionClose = document.getElementById('selectionClose');
-        const modeToggle = document.getElementById('modeToggle');
-        const infoToggleBtn = document.getElementById('infoToggleBtn');
-        const infoSection = document.getElementById('infoSection');
-        const inputFieldWrapper = document.getElementById('inputFieldWrapper');
-        const inputMiniEmoticons = document.getElementById('inputMiniEmoticons');
-        
-        let isPanelOpen = false;
-        let selectedEmoticon = null;
-        let isStarred = false;
-        let isDragging = false;
-        let startY = 0;
-        let panelHeight = 0;
-        
-        // 미니 이모티콘 여부
-        const isMini = {{ 'true' if is_mini else 'false' }};
-        // 큰 이모티콘 여부
-        const isBig = {{ 'true' if is_big else 'false' }};
-        // 입력칸에 추가된 미니 이모티콘 목록
-        let miniEmoticons = [];
+        const taskId = '{{ task_id }}';
+        // 마지막으로 받은 상태의 ETag (변경이 없으면 서버가 304로 응답)
+        let lastEtag = null;
+        // 폴링 간격 (변경이 있으면 짧게, 변경이 없거나 오류가 나면 점점 길게)
+        let pollInterval = 500;
+        // 완료/실패 또는 페이지 이탈 시 진행 중인 요청과 예약된 폴링을 모두 중단
+        const abortController = new AbortController();
+        let stopped = false;
+        let pollTimer = null;
         
-        // Update send button state
-        function updateSendButton() {
-            if (messageInput.value.trim() || selectedEmoticon || miniEmoticons.length > 0) {
-                sendBtn.classList.add('active');
-                sendBtn.innerHTML = '<svg width="18" height="18" viewBox="0 0 24 24" fill="currentColor"><path d="M2.01 21L23 12 2.01 3 2 10l15 2-15 2z"/></svg>';
-            } else {
-                sendBtn.classList.remove('active');
-                sendBtn.textContent = '#';
-            }
+        function stopPolling() {
+            stopped = true;
+            clearTimeout(pollTimer);
+            abortController.abort();
         }
+        window.addEventListener('beforeunload', stopPolling);
         
-        messageInput.addEventListener('input', updateSendButton);
+        function scheduleFetch() {
+            if (stopped) return;
+            // 여러 클라이언트가 같은 주기로 몰리지 않도록 ±150ms 지터 추가
+            clearTimeout(pollTimer);
+            pollTimer = setTimeout(fetchStatus, pollInterval + (Math.random() * 300 - 150));
+        }
         
-        // 미니 이모티콘 입력칸 UI 업데이트
-        function updateMiniInput() {
-            if (miniEmoticons.length === 0) {
-                inputMiniEmoticons.style.display = 'none';
-                inputFieldWrapper.classList.remove('has-mini');
-            } else {
-                inputMiniEmoticons.style.display = 'flex';
-                inputFieldWrapper.classList.add('has-mini');
-                inputMiniEmoticons.innerHTML = miniEmoticons.map((e, i) => 
-                    `<span class="input-mini-item" data-mini-index="${i}"><img src="${e.src}" alt=""></span>`
-                ).join('');
+        async function fetchStatus() {
+            if (stopped) return;
+            try {
+                const headers = lastEtag ? { 'If-None-Match': lastEtag } : {};
+                const response = await fetch(`/status/${taskId}/json`, {
+                    headers,
+                    cache: 'no-store',
+                    signal: abortController.signal
+                });
+                if (response.status === 304) {
+                    // 변경 없음: 간격을 늘림 (최대 5초)
+                    pollInterval = Math.min(pollInterval * 1.5, 5000);
+                    scheduleFetch();
+                    return;
+                }
+                lastEtag = response.headers.get('ETag');
+                const data = await response.json();
+                scheduleUpdate(data);
+                // 변경 있음: 간격 초기화
+                pollInterval = 500;
+                
+                if (data.error || data.status === 'completed' || data.status === 'failed') {
+                    stopPolling();
+                } else {
+                    scheduleFetch();
+                }
+            } catch (error) {
+                if (error.name === 'AbortError') return;
+                console.error('Status fetch error:', error);
+                // 네트워크 오류: 간격을 두 배로 (최대 10초)
+                pollInterval = Math.min(pollInterval * 2, 10000);
+                scheduleFetch();
             }
-            updateSendButton();
         }
         
-        // 미니 이모티콘 입력칸에서 클릭 시 제거
-        inputMiniEmoticons.addEventListener('click', (e) => {
-            const item = e.target.closest('.input-mini-item');
-            if (!item) return;
-            const idx = parseInt(item.dataset.miniIndex);
-            miniEmoticons.splice(idx, 1);
-            updateMiniInput();
+        // 상태별 표시 문구/배지 클래스 (갱신마다 객체를 새로 만들지 않도록 한 번만 생성)
+        const STATUS_LABELS = Object.freeze({
+            pending: '대기 중',
+            running: '생성 중',
+            completed: '완료',
+            failed: '실패'
+        });
+        const STATUS_CLASSES = Object.freeze({
+            pending: 'status-pending',
+            running: 'status-running',
+            completed: 'status-completed',
+            failed: 'status-failed'
         });
         
-        // Send message or emoticon
-        function sendMessage() {
-            if (selectedEmoticon && !isMini) {
-                addMessage('', 'emoticon', selectedEmoticon.src);
-                closeSelection();
+        // 갱신 대상 노드는 한 번만 조회
+        const ui = {
+            loading: document.getElementById('loadingSection'),
+            status: document.getElementById('statusSection'),
+            statusBadge: document.getElementById('statusBadge'),
+            progressGroup: document.getElementById('progressGroup'),
+            progressBar: document.getElementById('progressBar'),
+            progressPercent: document.getElementById('progressPercent'),
+            progressText: document.getElementById('progressText'),
+            progressType: document.getElementById('progressType'),
+            currentTask: document.getElementById('currentTask'),
+            currentTaskDesc: document.getElementById('currentTaskDesc'),
+            resultSection: document.getElementById('resultSection'),
+            errorSection: document.getElementById('errorSection'),
+            errorMessage: document.getElementById('errorMessage'),
+            emoticonGrid: document.getElementById('emoticonGrid')
+        };
+        
+        // 그리드에 이미 추가한 이모티콘 수 (새로 생긴 항목만 추가)
+        let renderedCount = 0;
+        // 추가한 항목의 요청 순서(index), 그리드의 노드 순서와 같은 오름차순
+        const renderedIndexes = [];
+        
+        function renderEmoticonGrid(data) {
+            const emoticons = data.emoticons;
+            if (!emoticons || emoticons.length <= renderedCount) {
                 return;
             }
             
-            const text = messageInput.value.trim();
-            
-            // 미니 이모티콘 처리
-            if (isMini && miniEmoticons.length > 0) {
-                if (text === '' && miniEmoticons.length <= 6) {
-                    // 미니 이모티콘만 6개 이하: 말풍선 없이 가로로 배치
-                    addMiniOnlyMessage(miniEmoticons);
-                } else {
-                    // 텍스트와 섞여있거나 7개 이상: 말풍선 안에 인라인으로
-                    addMixedMessage(text, miniEmoticons);
+            // 새 항목만 추가 (기존 이미지 노드는 유지)
+            // 동시 생성으로 완료 순서대로 도착하므로 최종 결과와 같도록 index 위치에 삽입
+            for (let i = renderedCount; i < emoticons.length; i++) {
+                const index = emoticons[i].index ?? i;
+                const item = document.createElement('div');
+                item.className = 'emoticon-item';
+                const img = new Image();
+                img.src = emoticons[i].image_data;
+                img.alt = '이모티콘';
+                img.loading = 'lazy';
+                item.appendChild(img);
+                
+                let pos = renderedIndexes.length;
+                while (pos > 0 && renderedIndexes[pos - 1] > index) {
+                    pos--;
                 }
-                miniEmoticons = [];
-                messageInput.value = '';
-                updateMiniInput();
-                return;
+                ui.emoticonGrid.insertBefore(item, ui.emoticonGrid.children[pos] || null);
+                renderedIndexes.splice(pos, 0, index);
             }
-            
-            if (!text) return;
-            
-            addMessage(text, 'text');
-            messageInput.value = '';
-            updateSendButton();
+            ui.emoticonGrid.hidden = false;
+            renderedCount = emoticons.length;
         }
         
-        sendBtn.addEventListener('click', sendMessage);
-        messageInput.addEventListener('keypress', (e) => {
-            if (e.key === 'Enter') {
-                sendMessage();
+        function updateUI(data) {
+            if (data.error) {
+                // 작업이 없거나 만료된 경우
+                ui.loading.hidden = true;
+                ui.status.hidden = true;
+                ui.errorSection.hidden = false;
+                ui.errorMessage.textContent = data.error;
+                return;
             }
-        });
-        
-        // 미니 이모티콘만 전송 (6개 이하)
-        function addMiniOnlyMessage(emojis) {
-            const message = document.createElement('div');
-            message.className = 'message-mini-only';
-            
-            const time = new Date().toLocaleTimeString('ko-KR', { hour: '2-digit', minute: '2-digit' });
-            
-            const itemsHtml = emojis.map(e => `<div class="mini-only-item"><img src="${e.src}" alt=""></div>`).join('');
-            
-            message.innerHTML = `
-                <div class="mini-only-container">${itemsHtml}</div>
-                <span class="message-time">${time}</span>
-            `;
-            
-            chatArea.appendChild(message);
-            chatArea.scrollTop = chatArea.scrollHeight;
-        }
-        
-        // 텍스트와 미니 이모티콘 혼합 메시지
-        function addMixedMessage(text, emojis) {
-            const message = document.createElement('div');
-            message.className = 'message';
-            
-            const time = new Date().toLocaleTimeString('ko-KR', { hour: '2-digit', minute: '2-digit' });
-            
-            // 미니 이모티콘을 인라인으로 표시
-            const emojisHtml = emojis.map(e => `<span class="mini-emoticon-inline"><img src="${e.src}" alt=""></span>`).join('');
-            const content = escapeHtml(text) + emojisHtml;
-            
-            message.innerHTML = `
-                <div class="message-bubble">${content}</div>
-                <span class="message-time">${time}</span>
-            `;
-            
-            chatArea.appendChild(message);
-            chatArea.scrollTop = chatArea.scrollHeight;
-        }
-        
-        // Add message to chat
-        function addMessage(content, type, imageSrc = '') {
-            const message = document.createElement('div');
-            message.className = 'message';
-            
-            const time = new Date().toLocaleTimeString('ko-KR', { hour: '2-digit', minute: '2-digit' });
-            
-            if (type === 'text') {
-                message.innerHTML = `
-                    <div class="message-bubble">${escapeHtml(content)}</div>
-                    <span class="message-time">${time}</span>
-                `;
-            } else if (type === 'emoticon') {
-                const bigClass = isBig ? ' big-emoticon' : '';
-                message.innerHTML = `
-                    <div class="message-bubble message-emoticon${bigClass}">
-                        <img src="${imageSrc}" alt="이모티콘">
-                    </div>
-                    <span class="message-time">${time}</span>
-                `;
+            const statusText = STATUS_LABELS[data.status] || data.status;
+            const statusClass = STATUS_CLASSES[data.status] || '';
+            const inProgress = data.status === 'running' || data.status === 'pending';
+            
+            // innerHTML 재작성 없이 바뀐 값만 노드에 반영
+            ui.loading.hidden = true;
+            ui.status.hidden = false;
+            ui.statusBadge.textContent = statusText;
+            ui.statusBadge.className = 'status-badge ' + statusClass;
+            
+            ui.progressGroup.hidden = !inProgress;
+            if (inProgress) {
+                ui.progressBar.style.width = data.progress_percent + '%';
+                ui.progressPercent.textContent = data.progress_percent + '%';
+                ui.progressText.textContent = `${data.completed_count} / ${data.total_count} 완료`;
+                ui.progressType.textContent = data.emoticon_type;
+                ui.currentTaskDesc.textContent = data.current_description || '';
+                ui.currentTask.hidden = !data.current_description;
             }
             
-            chatArea.appendChild(message);
-            chatArea.scrollTop = chatArea.scrollHeight;
+            ui.resultSection.hidden = data.status !== 'completed';
+            ui.errorSection.hidden = data.status !== 'failed';
+            if (data.status === 'failed') {
+                ui.errorMessage.textContent = data.error_message || '알 수 없는 오류';
+            }
+            // 생성되는 대로 그리드에 추가 (완료 전에도 진행 결과 표시)
+            renderEmoticonGrid(data);
         }
         
-        function escapeHtml(text) {
-            const div = document.createElement('div');
-            div.textContent = text;
-            return div.innerHTML;
-        }
+        // DOM 갱신은 다음 프레임에 한 번만 (프레임 사이에 온 상태는 최신 것만 반영)
+        let latestData = null;
+        let updateScheduled = false;
         
-        // Toggle emoticon panel
-        emojiBtn.addEventListener('click', () => {
-            isPanelOpen = !isPanelOpen;
-            emoticonPanel.classList.toggle('open', isPanelOpen);
-            emojiBtn.classList.toggle('active', isPanelOpen);
-            
-            if (!isPanelOpen) {
-                emoticonPanel.style.maxHeight = '';
-                closeSelection();
-            }
-        });
+        function scheduleUpdate(data) {
+            latestData = data;
+            if (updateScheduled) return;
+            updateScheduled = true;
+            requestAnimationFrame(() => {
+                updateScheduled = false;
+                updateUI(latestData);
+            });
+        }
         
-        // Emoticon selection
-        emoticonGrid.addEventListener('click', (e) => {
-            const item = e.target.closest('.emoticon-item');
-            if (!item) return;
-            
-            if (isMini) {
-                // 미니 이모티콘: 입력칸에 추가
-                miniEmoticons.push({
-                    index: item.dataset.index,
-                    src: item.dataset.src
-                });
-                updateMiniInput();
+        // 서버 푸시(SSE)로 상태를 받고, 미지원이거나 연결이 끊기면 폴링으로 대체
+        function startStatusStream() {
+            if (!window.EventSource) {
+                fetchStatus();
                 return;
             }
-            
-            selectedEmoticon = {
-                index: item.dataset.index,
-                src: item.dataset.src
+            const es = new EventSource(`/status/${taskId}/events`);
+            es.onmessage = (event) => scheduleUpdate(JSON.parse(event.data));
+            es.addEventListener('done', (event) => {
+                es.close();
+                stopPolling();
+                // 작업을 찾지 못한 경우 서버가 오류 내용을 함께 전달
+                const data = JSON.parse(event.data || '{}');
+                if (data.error) {
+                    scheduleUpdate(data);
+                }
+            });
+            es.onerror = () => {
+                es.close();
+                fetchStatus();
             };
-            
-            selectionImage.src = selectedEmoticon.src;
-            selectionPopup.classList.add('active');
-            isStarred = false;
-            selectionStar.textContent = '☆';
-            selectionStar.classList.remove('filled');
-            updateSendButton();
-        });
-        
-        function closeSelection() {
-            selectionPopup.classList.remove('active');
-            selectedEmoticon = null;
-            updateSendButton();
-        }
-        
-        // Selection popup controls
-        selectionClose.addEventListener('click', closeSelection);
-        
-        selectionStar.addEventListener('click', () => {
-            isStarred = !isStarred;
-            selectionStar.textContent = isStarred ? '★' : '☆';
-            selectionStar.classList.toggle('filled', isStarred);
-        });
-        
-        // Drag handle for panel resize
-        dragHandle.addEventListener('mousedown', startDrag);
-        dragHandle.addEventListener('touchstart', startDrag, { passive: false });
-        
-        function startDrag(e) {
-            isDragging = true;
-            startY = e.type === 'mousedown' ? e.clientY : e.touches[0].clientY;
-            panelHeight = emoticonPanel.offsetHeight;
-            document.addEventListener('mousemove', onDrag);
-            document.addEventListener('mouseup', stopDrag);
-            document.addEventListener('touchmove', onDrag, { passive: false });
-            document.addEventListener('touchend', stopDrag);
-        }
-        
-        function onDrag(e) {
-            if (!isDragging) return;
-            e.preventDefault();
-            const clientY = e.type === 'mousemove' ? e.clientY : e.touches[0].clientY;
-            const delta = startY - clientY;
-            const newHeight = Math.min(Math.max(panelHeight + delta, 200), window.innerHeight * 0.8);
-            emoticonPanel.style.maxHeight = newHeight + 'px';
+            window.addEventListener('beforeunload', () => es.close());
         }
         
-        function stopDrag() {
-            isDragging = false;
-            document.removeEventListener('mousemove', onDrag);
-            document.removeEventListener('mouseup', stopDrag);
-            document.removeEventListener('touchmove', onDrag);
-            document.removeEventListener('touchend', stopDrag);
-        }
+        startStatusStream();
+    </script>
+</body>
+</html>
+"""
+
+# after-preview 템플릿 (완성본)
+AFTER_PREVIEW_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="ko">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=1.0, user-scalable=no">
+    <title>{{ title }} - 이모티콘 프리뷰</title>
+    <link rel="stylesheet" href="{{ css_url }}">
+</head>
+<body>
+    <div class="chat-container light-mode" id="chatContainer">
+        <div class="header">
+            <div class="header-back">
+                <svg width="20" height="20" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
+                    <path d="M15 18l-6-6 6-6"/>
+                </svg>
+            </div>
+            <div class="header-title">{{ title }}</div>
+            <div class="header-actions">
+                <span class="badge">완성</span>
+                <button class="mode-toggle" id="modeToggle" data-action="toggleMode" title="다크/라이트 모드 전환">☀️</button>
+            </div>
+        </div>
         
-        // Mode toggle
-        modeToggle.addEventListener('click', () => {
-            chatContainer.classList.toggle('light-mode');
-            modeToggle.textContent = chatContainer.classList.contains('light-mode') ? '☀️' : '🌙';
-        });
+        <div class="chat-area" id="chatArea">
+            <div class="download-banner">
+                <a href="{{ download_url }}" class="download-btn" download>ZIP 다운로드</a>
+            </div>
+        </div>
         
-        // Info toggle
-        infoToggleBtn.addEventListener('click', () => {
-            const isOpen = infoSection.classList.toggle('open');
-            infoToggleBtn.textContent = isOpen ? '상세 정보 닫기 ▲' : '상세 정보 보기 ▼';
-        });
+        <div class="input-wrapper" id="inputWrapper">
+            <div class="selection-popup" id="selectionPopup">
+                <button class="selection-star" id="selectionStar" data-action="toggleStar">☆</button>
+                <div class="selection-emoticon" id="selectionEmoticon">
+                    <img src="" alt="" id="selectionImage">
+                </div>
+                <button class="selection-close" id="selectionClose" data-action="closeSelection">✕</button>
+            </div>
+            <div class="input-bar">
+                <button class="input-btn" id="addBtn">+</button>
+                <div class="input-field-wrapper" id="inputFieldWrapper">
+                    <div class="input-mini-emoticons" id="inputMiniEmoticons" style="display: none;"></div>
+                    <input type="text" class="input-field" id="messageInput" placeholder="메시지 입력">
+                    <button class="emoji-btn" id="emojiBtn" data-action="togglePanel">☺︎</button>
+                </div>
+                <button class="send-btn" id="sendBtn" data-action="send">#</button>
+            </div>
+        </div>
+        
+        <div class="emoticon-panel" id="emoticonPanel">
+            <div class="panel-drag-handle" id="dragHandle">
+                <div class="panel-drag-bar"></div>
+            </div>
+            
+            <div class="panel-category-bar">
+                <button class="panel-category-btn">검색</button>
+                <button class="panel-category-btn{% if not is_mini %} active{% endif %}" data-category="emoticon">이모티콘</button>
+                <button class="panel-category-btn{% if is_mini %} active{% endif %}" data-category="mini">미니 이모티콘</button>
+            </div>
+            
+            <div class="panel-tabs">
+                <button class="panel-tab panel-tab-stacked"><span>○</span><span>☆</span></button>
+                <div class="panel-tab-divider"></div>
+                <button class="panel-tab panel-tab-all">ALL</button>
+                {% if icon %}
+                <button class="panel-tab active" id="emoticonTabBtn">
+                    <img src="{{ icon }}" alt="" class="panel-tab-icon">
+                </button>
+                {% else %}
+                <button class="panel-tab active" id="emoticonTabBtn">☺︎</button>
+                {% endif %}
+            </div>
+            
+            <div class="panel-title-row">
+                {% if icon %}
+                <img src="{{ icon }}" alt="" class="panel-icon-preview">
+                {% endif %}
+                <span class="panel-title">{{ title }}</span>
+                <span class="panel-title-arrow">›</span>
+                <span class="panel-type-badge">{{ emoticon_type_name }}</span>
+            </div>
+            
+            <div class="emoticon-grid{% if is_mini %} mini-grid{% elif is_big %} big-grid{% endif %}" id="emoticonGrid">
+                {{ grid }}
+            </div>
+            
+            <div class="info-toggle">
+                <button class="info-toggle-btn" id="infoToggleBtn" data-action="toggleInfo">상세 정보 보기 ▼</button>
+            </div>
+            
+            <div class="info-section" id="infoSection">
+                <div class="info-row">
+                    <span class="info-label">이모티콘 타입</span>
+                    <span class="info-value">{{ emoticon_type_name }}</span>
+                </div>
+                <div class="info-row">
+                    <span class="info-label">총 개수</span>
+                    <span class="info-value">{{ emoticon_count }}개</span>
+                </div>
+            </div>
+        </div>
+    </div>
+    
+    <script>
+        // 미니 이모티콘 여부
+        const isMini = {{ 'true' if is_mini else 'false' }};
+        // 큰 이모티콘 여부
+        const isBig = {{ 'true' if is_big else 'false' }};
     </script>
+    <script src="{{ js_url }}"></script>
 </body>
 </html>
 """
 
+# 그리드 항목은 Jinja 루프 대신 Python에서 한 번에 조립 (이모티콘 수만큼 반복)
+AFTER_PREVIEW_ITEM = """                <div class="emoticon-item{item_class}" data-index="{index}">
+                    <img src="data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7" data-src="{src}" loading="lazy" decoding="async" alt="이모티콘 {index}">
+                </div>
+"""
+
+
+# CSS 압축용 정규식 (문자열 리터럴은 그대로 유지)
+_CSS_TOKEN_RE = re.compile(r"""("[^"]*"|'[^']*')|/\*.*?\*/|\s+""", re.S)
+_CSS_PUNCT_RE = re.compile(r"\s*([{};,>])\s*")
+_SCRIPT_BLOCK_RE = re.compile(r"(<script>)(.*?)(</script>)", re.S)
+_HTML_COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+
+
+def _minify_css(css: str) -> str:
+    """주석과 불필요한 공백을 제거하여 CSS를 압축합니다."""
+    def _replace(match: "re.Match[str]") -> str:
+        if match.group(1):
+            return match.group(1)
+        # 주석은 제거, 연속 공백은 하나로
+        return "" if match.group(0).startswith("/*") else " "
+    
+    css = _CSS_TOKEN_RE.sub(_replace, css)
+    css = _CSS_PUNCT_RE.sub(r"\1", css).replace(": ", ":").replace(";}", "}")
+    # "{#"는 Jinja 주석 시작 구문이므로 공백으로 분리
+    return css.replace("{#", "{ #").strip()
+
+
+def _minify_js(js: str) -> str:
+    """
+    JS에서 들여쓰기, 빈 줄, 한 줄 주석을 제거합니다.
+    
+    줄바꿈은 유지하여 세미콜론 자동 삽입(ASI) 동작이 바뀌지 않도록 합니다.
+    """
+    lines = (line.strip() for line in js.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//"))
+
+
+def _minify_script_blocks(template: str) -> str:
+    """템플릿 내 인라인 <script> 블록을 모듈 로드 시 한 번만 압축합니다."""
+    return _SCRIPT_BLOCK_RE.sub(
+        lambda m: m.group(1) + _minify_js(m.group(2)) + m.group(3),
+        template
+    )
+
+
+def _minify_html(template: str) -> str:
+    """
+    HTML 주석, 들여쓰기, 빈 줄을 제거합니다.
+    
+    줄 앞 공백은 브라우저에서 공백 하나로 합쳐지므로 제거해도 렌더링 결과가 같습니다.
+    (<pre>/<textarea>처럼 공백을 보존하는 요소가 없는 템플릿에만 사용)
+    """
+    template = _HTML_COMMENT_RE.sub("", template)
+    lines = (line.strip() for line in template.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+_BEFORE_CSS = _minify_css(_BEFORE_CSS)
+_BEFORE_JS = _minify_js(_BEFORE_JS)
+_STATUS_CSS = _minify_css(_STATUS_CSS)
+_AFTER_CSS = _minify_css(_AFTER_CSS)
+_AFTER_JS = _minify_js(_AFTER_JS)
+BEFORE_PREVIEW_PREFIX = _minify_html(BEFORE_PREVIEW_PREFIX)
+BEFORE_PREVIEW_ITEM = _minify_html(BEFORE_PREVIEW_ITEM)
+BEFORE_PREVIEW_SUFFIX = _minify_html(_minify_script_blocks(BEFORE_PREVIEW_SUFFIX))
+STATUS_PAGE_TEMPLATE = _minify_html(_minify_script_blocks(STATUS_PAGE_TEMPLATE))
+AFTER_PREVIEW_TEMPLATE = _minify_html(_minify_script_blocks(AFTER_PREVIEW_TEMPLATE))
+AFTER_PREVIEW_ITEM = _minify_html(AFTER_PREVIEW_ITEM)
+
+# 상태 페이지 조각: [리터럴, 자리표시자 이름, 리터럴, ...]
+_STATUS_PAGE_PARTS: List[str] = re.split(r"\{\{ (\w+) \}\}", STATUS_PAGE_TEMPLATE)
+
+
+def _static_asset(content: str, media_type: str) -> Dict[str, Any]:
+    """정적 파일 항목 생성 (내용 해시를 캐시 무효화용 버전으로 사용)"""
+    data = content.encode("utf-8")
+    return {
+        "data": data,
+        # 내용이 고정이므로 모듈 로드 시 최대 압축률로 한 번만 압축
+        "gzip": gzip.compress(data, 9, mtime=0),
+        "media_type": media_type,
+        "version": hashlib.sha1(data).hexdigest()[:10],
+    }
+
+
+# /static/{name} 경로로 제공되는 정적 파일 (프리뷰마다 인라인하지 않고 브라우저 캐시 활용)
+STATIC_ASSETS: Dict[str, Dict[str, Any]] = {
+    "before-preview.js": _static_asset(_BEFORE_JS, "application/javascript; charset=utf-8"),
+    "status.css": _static_asset(_STATUS_CSS, "text/css; charset=utf-8"),
+    "after-preview.css": _static_asset(_AFTER_CSS, "text/css; charset=utf-8"),
+    "after-preview.js": _static_asset(_AFTER_JS, "application/javascript; charset=utf-8"),
+}
+
+class _ZipChunkWriter:
+    """
+    ZipFile 출력을 모아 두었다가 조각 단위로 꺼내는 쓰기 전용 스트림
+    
+    tell/seek을 제공하지 않으므로 ZipFile은 데이터 디스크립터 방식으로 기록합니다.
+    """
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+    
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self) -> None:
+        pass
+    
+    def drain(self) -> bytes:
+        """지금까지 기록된 바이트를 꺼내고 버퍼를 비움"""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+# 이모티콘 타입 조회 테이블 (Enum과 문자열 값 모두 키로 사용)
+# str Enum은 값 문자열과 해시가 달라 두 형태를 모두 등록해야 함
+_EMOTICON_TYPES: Dict[Any, EmoticonType] = {
+    **{t: t for t in EmoticonType},
+    **{t.value: t for t in EmoticonType},
+}
+
+
+def _resolve_emoticon_type(emoticon_type: EmoticonType | str) -> EmoticonType:
+    """이모티콘 타입을 Enum으로 변환 (알 수 없는 값은 ValueError)"""
+    type_key = _EMOTICON_TYPES.get(emoticon_type)
+    if type_key is None:
+        return EmoticonType(emoticon_type)
+    return type_key
+
+
+# 이모티콘 타입별 렌더링 컨텍스트 (타입에서 파생되는 값은 모듈 로드 시 한 번만 계산)
+_TYPE_CONTEXT: Dict[EmoticonType, Dict[str, Any]] = {
+    t: {
+        "emoticon_type": t,
+        "emoticon_type_name": EMOTICON_TYPE_NAMES[t],
+        "spec": EMOTICON_SPECS[t],
+        # 미니 이모티콘 여부 확인
+        "is_mini": t in (EmoticonType.STATIC_MINI, EmoticonType.DYNAMIC_MINI),
+        # 큰 이모티콘 여부 확인
+        "is_big": t == EmoticonType.BIG,
+    }
+    for t in EmoticonType
+}
+
+
+def _preview_image_url(image_ref: str) -> str:
+    """서버 이미지 URL이면 프리뷰 표시용 변형 URL(/image/{id}/preview)로 변환"""
+    match = _IMAGE_ID_RE.search(image_ref)
+    if match and match.end() == len(image_ref):
+        return f"{image_ref}/preview"
+    return image_ref
+
+
+def avif_preview_enabled() -> bool:
+    """프리뷰 이미지의 AVIF 변형 제공 여부 (설정으로 꺼져 있거나 Pillow가 AVIF를 지원하지 않으면 False)"""
+    if PREVIEW_AVIF_QUALITY <= 0:
+        return False
+    # PIL을 불러오는 모듈이므로 필요할 때만 임포트
+    from src.image_utils import avif_supported
+    return avif_supported()
+
+
+@functools.lru_cache(maxsize=1024)
+def _escape_cached(text: str) -> Markup:
+    """
+    HTML 이스케이프 결과를 캐시합니다.
+    
+    같은 기획 설명/제목이 여러 프리뷰에서 반복 렌더링되므로 문자열별로 한 번만 이스케이프합니다.
+    """
+    return escape(text)
+
+
+def _sniff_image_mime(data: bytes) -> Optional[str]:
+    """매직 바이트로 이미지 MIME 타입 판별 (알 수 없으면 None)"""
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+# 서버 이미지 URL에서 이미지 ID 추출 (/image/{id}?...#... 형식)
+_IMAGE_ID_RE = re.compile(r"/image/([A-Za-z0-9_-]+)")
+
+# 랜덤 바이트 → URL-safe 문자 변환 테이블 (256은 64의 배수라 모든 문자가 같은 확률)
+_ID_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+_ID_TRANSLATE_TABLE = bytes(_ID_ALPHABET[i & 63] for i in range(256))
+# 한 번에 받아 둘 랜덤 바이트 수 (8자 ID 128개 분량)
+_ID_POOL_SIZE = 1024
+
+# after-preview 그리드 이미지의 AVIF 변형 품질 (0이면 비활성)
+# 브라우저 표시용일 뿐이며, ZIP과 원본 이미지 URL은 항상 카카오 사양 형식(PNG/WebP) 그대로 제공
+PREVIEW_AVIF_QUALITY = int(os.environ.get("PREVIEW_AVIF_QUALITY", 70))
+
+# 새 ID 발급 시 충돌 재시도 횟수
+_MAX_ID_ATTEMPTS = 5
+
+# 이 크기 이상의 base64 문자열은 스레드에서 디코딩 (작은 입력은 스레드 전환 비용이 더 큼)
+_THREAD_DECODE_MIN_SIZE = 64 * 1024
+
+# 렌더링 결과 캐시 크기 (같은 컨텍스트의 반복 조회 시 재렌더링 생략)
+# 환경변수로 커스터마이징 가능: PREVIEW_RENDER_CACHE_SIZE=64 등
+PREVIEW_RENDER_CACHE_SIZE = int(os.environ.get("PREVIEW_RENDER_CACHE_SIZE", 32))
+
+# 컴파일된 템플릿 바이트코드 캐시 디렉토리 (프로세스 재시작 시 재사용)
+# 환경변수로 커스터마이징 가능: JINJA_BYTECODE_CACHE_DIR=/path/to/cache
+JINJA_BYTECODE_CACHE_DIR = os.environ.get(
+    "JINJA_BYTECODE_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "playmcp_jinja_bc")
+)
+
+
+def _create_bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    """바이트코드 캐시 생성 (디렉토리를 만들 수 없으면 캐시 없이 동작)"""
+    try:
+        os.makedirs(JINJA_BYTECODE_CACHE_DIR, exist_ok=True)
+        return FileSystemBytecodeCache(directory=JINJA_BYTECODE_CACHE_DIR)
+    except OSError as e:
+        print(f"Jinja bytecode cache disabled: {e}")
+        return None
+
+
+# 공유 Jinja 환경 (자동 이스케이프 + 블록 태그 주변 공백 제거)
+# 바이트코드 캐시 키를 위해 템플릿을 고정된 이름으로 등록
+_ENV = Environment(
+    loader=DictLoader({
+        "after": AFTER_PREVIEW_TEMPLATE,
+    }),
+    bytecode_cache=_create_bytecode_cache(),
+    auto_reload=False,
+    autoescape=True,
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+
+# 컴파일된 템플릿 (모듈 로드 시 한 번만 생성)
+_AFTER_TMPL = _ENV.get_template("after")
+
 
 class PreviewGenerator:
     """프리뷰 페이지 생성기 (Redis 기반)"""
@@ -2391,6 +2905,13 @@ class PreviewGenerator:
         """
         self.base_url = base_url.rstrip("/")
         self._storage = get_storage()
+        # ID 생성용 랜덤 바이트 풀과 다음 사용 위치
+        self._id_pool = b""
+        self._id_pool_pos = 0
+        # 저장된 컨텍스트(JSON 바이트) → 렌더링된 HTML 캐시
+        self._render_cached = functools.lru_cache(maxsize=PREVIEW_RENDER_CACHE_SIZE)(
+            self._render_context_bytes
+        )
     
     def _generate_short_id(self, length: int = 8) -> str:
         """
@@ -2400,10 +2921,40 @@ class PreviewGenerator:
             length: ID 길이 (기본값: 8)
             
         Returns:
-            영문+숫자로 구성된 랜덤 문자열
+            URL-safe 랜덤 문자열 (영문, 숫자, '-', '_')
+        """
+        # 랜덤 바이트는 한 번에 넉넉히 받아 두고 나눠 사용 (ID마다 os.urandom 호출하지 않음)
+        pos = self._id_pool_pos
+        if pos + length > len(self._id_pool):
+            self._id_pool = os.urandom(max(_ID_POOL_SIZE, length))
+            pos = 0
+        self._id_pool_pos = pos + length
+        # bytes.translate로 문자 매핑 (C 수준)
+        return self._id_pool[pos:pos + length].translate(_ID_TRANSLATE_TABLE).decode("ascii")
+    
+    async def _store_with_new_id(
+        self,
+        key_func: Callable[[str], str],
+        data: bytes,
+        ttl: int
+    ) -> str:
+        """
+        새 ID를 발급하여 데이터를 저장합니다 (ID 충돌 시 재발급).
+        
+        Args:
+            key_func: ID를 저장소 키로 변환하는 함수 (예: preview_key)
+            data: 저장할 데이터
+            ttl: 만료 시간 (초)
+            
+        Returns:
+            발급된 ID
         """
-        alphabet = string.ascii_letters + string.digits
-        return ''.join(secrets.choice(alphabet) for _ in range(length))
+        for _ in range(_MAX_ID_ATTEMPTS):
+            new_id = self._generate_short_id()
+            # SET NX로 기존 항목을 덮어쓰지 않고 원자적으로 등록
+            if await self._storage.set_nx(key_func(new_id), data, ttl=ttl):
+                return new_id
+        raise RuntimeError(f"Failed to allocate a unique ID after {_MAX_ID_ATTEMPTS} attempts")
     
     async def store_image(self, image_data: bytes, mime_type: str = "image/png") -> str:
         """
@@ -2416,11 +2967,10 @@ class PreviewGenerator:
         Returns:
             이미지 URL (예: /image/{image_id} 또는 {base_url}/image/{image_id})
         """
-        image_id = self._generate_short_id()
         ttl = get_ttl("image")
         
         # 이미지 데이터 저장 (바이너리)
-        await self._storage.set(image_key(image_id), image_data, ttl=ttl)
+        image_id = await self._store_with_new_id(image_key, image_data, ttl)
         # 메타데이터 저장 (JSON)
         await self._storage.set_json(f"{image_key(image_id)}:meta", {"mime_type": mime_type}, ttl=ttl)
         
@@ -2441,13 +2991,20 @@ class PreviewGenerator:
         """
         if base64_data.startswith("data:"):
             # data:image/png;base64,... 형식 파싱
-            header, data = base64_data.split(",", 1)
-            mime_type = header.split(":")[1].split(";")[0]
+            header, _, data = base64_data.partition(",")
+        else:
+            header, data = "", base64_data
+        
+        if len(data) >= _THREAD_DECODE_MIN_SIZE:
+            # 여러 이미지를 gather로 동시에 저장할 때 디코딩이 이벤트 루프에서 직렬화되지 않도록 스레드로 분산
+            image_bytes = await asyncio.to_thread(_b64.b64decode, data, validate=False)
         else:
-            data = base64_data
-            mime_type = "image/png"
+            image_bytes = _b64.b64decode(data, validate=False)
         
-        image_bytes = base64.b64decode(data)
+        # MIME 타입은 실제 바이트로 판별 (data URL 헤더는 판별 불가 시에만 사용)
+        mime_type = _sniff_image_mime(image_bytes)
+        if mime_type is None:
+            mime_type = header[5:].partition(";")[0] or "image/png"
         return await self.store_image(image_bytes, mime_type)
     
     async def get_image(self, image_id: str) -> Optional[Dict[str, Any]]:
@@ -2461,45 +3018,85 @@ class PreviewGenerator:
             {"data": bytes, "mime_type": str} 또는 None
         """
         key = image_key(image_id)
-        data = await self._storage.get(key)
+        # 이미지와 메타데이터를 동시에 조회 (Redis 왕복 1회 분량으로 단축)
+        data, meta = await asyncio.gather(
+            self._storage.get(key),
+            self._storage.get_json(f"{key}:meta")
+        )
         if data:
-            # 메타데이터 조회
-            meta = await self._storage.get_json(f"{key}:meta")
             mime_type = meta.get("mime_type", "image/png") if meta else "image/png"
             return {"data": data, "mime_type": mime_type}
         
         print(f"[DEBUG] Image not found - key: {key}, image_id: {image_id}")
         return None
     
+    async def get_preview_image(self, image_id: str, accept_avif: bool) -> Optional[Dict[str, Any]]:
+        """
+        프리뷰 표시용 이미지 반환
+        
+        브라우저가 AVIF를 받을 수 있으면 정지 이미지를 AVIF로 변환해 반환합니다.
+        변환 결과는 저장소에 캐시하며, 이득이 없으면(애니메이션/더 큼) 빈 값을 캐시해 원본을 반환합니다.
+        
+        Args:
+            image_id: 이미지 ID
+            accept_avif: 클라이언트가 image/avif를 허용하는지 여부
+            
+        Returns:
+            {"data": bytes, "mime_type": str} 또는 None
+        """
+        if not accept_avif or not avif_preview_enabled():
+            return await self.get_image(image_id)
+        
+        variant_key = f"{image_key(image_id)}:avif"
+        avif = await self._storage.get(variant_key)
+        if avif is None:
+            image = await self.get_image(image_id)
+            if image is None:
+                return None
+            # PIL을 불러오는 모듈이므로 필요할 때만 임포트
+            from src.image_utils import encode_preview_avif, run_image_job
+            # 생성 작업과 같은 이미지 전용 스레드 풀에서 변환 (실패해도 빈 값을 캐시하고 원본 반환)
+            avif = await run_image_job(encode_preview_avif, image["data"], PREVIEW_AVIF_QUALITY) or b""
+            await self._storage.set(variant_key, avif, ttl=get_ttl("image"))
+            if not avif:
+                return image
+        elif not avif:
+            return await self.get_image(image_id)
+        
+        return {"data": avif, "mime_type": "image/avif"}
+    
     async def generate_status_page(self, task_id: str) -> str:
         """
         생성 작업 상태 페이지 URL 생성
         
+        상태 페이지는 task_id만 다른 고정 페이지이므로 저장하지 않고 조회 시 렌더링합니다.
+        
         Args:
             task_id: 작업 ID
             
         Returns:
             상태 페이지 URL
         """
-        template = Template(STATUS_PAGE_TEMPLATE)
-        html_content = template.render(task_id=task_id)
-        
-        # 상태 페이지 저장
-        await self._storage.set(status_key(task_id), html_content.encode('utf-8'), ttl=get_ttl("status"))
-        
         if self.base_url:
             return f"{self.base_url}/status/{task_id}"
         else:
             return f"/status/{task_id}"
     
+    def _static_url(self, asset_name: str) -> str:
+        """정적 파일 URL (내용 해시 버전 포함, 내용이 바뀌면 URL도 바뀜)"""
+        return f"{self.base_url}/static/{asset_name}?v={STATIC_ASSETS[asset_name]['version']}"
+    
     async def get_status_html(self, task_id: str) -> Optional[str]:
-        """저장된 상태 페이지 HTML 반환"""
-        key = status_key(task_id)
-        data = await self._storage.get(key)
-        if data:
-            return data.decode('utf-8')
-        # status page는 없으면 동적으로 생성하므로 로그 출력 생략
-        return None
+        """상태 페이지 HTML 렌더링 (미리 나눠 둔 조각에 값만 끼워 넣음)"""
+        values = {
+            "task_id": escape(task_id),
+            "css_url": self._static_url("status.css"),
+        }
+        # 홀수 번째 조각이 자리표시자 이름
+        return "".join(
+            values[part] if i % 2 else part
+            for i, part in enumerate(_STATUS_PAGE_PARTS)
+        )
     
     async def generate_before_preview(
         self,
@@ -2518,29 +3115,22 @@ class PreviewGenerator:
         Returns:
             프리뷰 페이지 URL
         """
-        spec = get_emoticon_spec(emoticon_type)
-        # Enum을 문자열로 변환하여 EMOTICON_TYPE_NAMES 조회
-        type_key = EmoticonType(emoticon_type) if isinstance(emoticon_type, str) else emoticon_type
-        emoticon_type_name = EMOTICON_TYPE_NAMES[type_key]
+        type_key = _resolve_emoticon_type(emoticon_type)
         
-        # 미니 이모티콘 여부 확인
-        is_mini = type_key in [EmoticonType.STATIC_MINI, EmoticonType.DYNAMIC_MINI]
-        # 큰 이모티콘 여부 확인
-        is_big = type_key == EmoticonType.BIG
-        
-        template = Template(BEFORE_PREVIEW_TEMPLATE)
-        html_content = template.render(
-            title=title,
-            emoticon_type=emoticon_type,
-            emoticon_type_name=emoticon_type_name,
-            plans=plans,
-            spec=spec,
-            is_mini=is_mini,
-            is_big=is_big
-        )
+        # 렌더링된 HTML 대신 렌더링 컨텍스트만 저장 (조회 시 렌더링)
+        context = {
+            "kind": "before",
+            "emoticon_type": type_key.value,
+            "title": title,
+            "plans": [
+                {"description": plan.get("description", ""), "file_type": plan.get("file_type", "")}
+                for plan in plans
+            ],
+        }
         
-        preview_id = self._generate_short_id()
-        await self._storage.set(preview_key(preview_id), html_content.encode('utf-8'), ttl=get_ttl("preview"))
+        preview_id = await self._store_with_new_id(
+            preview_key, json.dumps(context, ensure_ascii=False).encode('utf-8'), get_ttl("preview")
+        )
         
         if self.base_url:
             return f"{self.base_url}/preview/{preview_id}"
@@ -2566,40 +3156,67 @@ class PreviewGenerator:
         Returns:
             (프리뷰 페이지 URL, ZIP 다운로드 URL) 튜플
         """
-        spec = get_emoticon_spec(emoticon_type)
-        # Enum을 문자열로 변환하여 EMOTICON_TYPE_NAMES 조회
-        type_key = EmoticonType(emoticon_type) if isinstance(emoticon_type, str) else emoticon_type
-        emoticon_type_name = EMOTICON_TYPE_NAMES[type_key]
-        
-        # 미니 이모티콘 여부 확인
-        is_mini = type_key in [EmoticonType.STATIC_MINI, EmoticonType.DYNAMIC_MINI]
-        # 큰 이모티콘 여부 확인
-        is_big = type_key == EmoticonType.BIG
-        
-        # ZIP 파일 생성
-        download_id = self._generate_short_id()
-        zip_bytes = await self._create_zip(emoticons, icon, spec.format.lower())
-        await self._storage.set(zip_key(download_id), zip_bytes, ttl=get_ttl("zip"))
+        type_key = _resolve_emoticon_type(emoticon_type)
+        spec = EMOTICON_SPECS[type_key]
+        
+        # 입력 이미지를 모두 서버 이미지 URL(/image/{id})로 정규화
+        # (이후 HTML과 ZIP은 저장된 바이트만 참조하므로 base64를 다시 디코딩하지 않음)
+        refs = [emoticon.get("image_data", "") for emoticon in emoticons]
+        unique_refs = list(dict.fromkeys(refs + ([icon] if icon else [])))
+        urls = await asyncio.gather(
+            *(self._to_image_url(ref) for ref in unique_refs)
+        )
+        url_map = dict(zip(unique_refs, urls))
+        # 이후 단계는 이미지 URL만 사용하므로 이모티콘 dict를 다시 만들지 않고 URL 목록만 유지
+        image_urls = [url_map[ref] for ref in refs]
+        if icon:
+            icon = url_map[icon]
+        
+        # ZIP은 미리 만들지 않고 파일 목록만 저장 (다운로드 시 저장된 이미지로 스트리밍 생성)
+        # 이미지 바이트가 ZIP에 한 번 더 저장되지 않으므로 저장소 메모리 절약
+        # 참조는 여기서 이미지 ID로 한 번만 변환 (서버 이미지가 아닌 항목은 ZIP에서 제외)
+        file_format = spec.format.lower()
+        named_refs = [
+            (f"emoticon_{idx:02d}.{file_format}", url)
+            for idx, url in enumerate(image_urls, 1)
+        ]
+        if icon:
+            named_refs.append(("icon.png", icon))
+        files = [
+            [filename, match.group(1)]
+            for filename, ref in named_refs
+            if (match := _IMAGE_ID_RE.search(ref))
+        ]
+        # 이미지는 생성 시점의 TTL로 저장되어 있으므로, 이 프리뷰/ZIP보다 먼저 만료되지 않도록 연장
+        member_ttl = max(get_ttl("zip"), get_ttl("preview"))
+        member_ids = dict.fromkeys(image_id for _, image_id in files)
+        await asyncio.gather(*(
+            self._storage.extend_ttl(key, member_ttl)
+            for image_id in member_ids
+            for key in (image_key(image_id), f"{image_key(image_id)}:meta")
+        ))
+        download_id = await self._store_with_new_id(
+            zip_key, json.dumps({"files": files}).encode('utf-8'), get_ttl("zip")
+        )
         
         if self.base_url:
             download_url = f"{self.base_url}/download/{download_id}"
         else:
             download_url = f"/download/{download_id}"
         
-        template = Template(AFTER_PREVIEW_TEMPLATE)
-        html_content = template.render(
-            title=title,
-            emoticon_type=emoticon_type,
-            emoticon_type_name=emoticon_type_name,
-            emoticons=emoticons,
-            icon=icon,
-            download_url=download_url,
-            is_mini=is_mini,
-            is_big=is_big
-        )
+        # 렌더링된 HTML 대신 렌더링 컨텍스트만 저장 (조회 시 렌더링)
+        context = {
+            "kind": "after",
+            "emoticon_type": type_key.value,
+            "title": title,
+            "emoticons": [{"image_data": url} for url in image_urls],
+            "icon": icon,
+            "download_url": download_url,
+        }
         
-        preview_id = self._generate_short_id()
-        await self._storage.set(preview_key(preview_id), html_content.encode('utf-8'), ttl=get_ttl("preview"))
+        preview_id = await self._store_with_new_id(
+            preview_key, json.dumps(context, ensure_ascii=False).encode('utf-8'), get_ttl("preview")
+        )
         
         if self.base_url:
             preview_url = f"{self.base_url}/preview/{preview_id}"
@@ -2608,92 +3225,329 @@ class PreviewGenerator:
         
         return preview_url, download_url
     
-    async def _get_image_bytes_from_ref(self, image_ref: str) -> Optional[bytes]:
+    async def load_image_bytes(self, image_ref: str, allow_remote: bool = True) -> bytes:
         """
-        이미지 참조(서버 URL, data URL, 또는 base64)에서 바이트를 추출합니다.
+        이미지 참조에서 바이트를 얻습니다.
+        
+        이 서버가 발급한 이미지 URL(/image/{id})은 저장소에서 바로 읽고
+        (자기 서버로의 HTTP 요청이나 base64 재변환 없음), 그 외 URL/base64는 기존 방식으로 처리합니다.
         
         Args:
-            image_ref: 이미지 URL (/image/{id}), data URL, 또는 base64 문자열
+            image_ref: 이미지 URL 또는 base64 문자열 (data URL 포함)
+            allow_remote: False이면 외부 URL을 다운로드하지 않고 ValueError 발생
             
         Returns:
-            이미지 바이트 또는 None
+            이미지 바이트 (서버 이미지 URL의 이미지가 없거나 만료되었으면 ValueError)
         """
-        if not image_ref:
-            return None
+        if image_ref.startswith("/image/") or (
+            self.base_url and image_ref.startswith(f"{self.base_url}/image/")
+        ):
+            match = _IMAGE_ID_RE.search(image_ref)
+            data = await self._storage.get(image_key(match.group(1))) if match else None
+            if data:
+                return data
+            # 서버 이미지 참조는 base64 디코딩이나 자기 서버 HTTP 요청으로 넘기지 않고 바로 실패
+            raise ValueError(f"이미지를 찾을 수 없거나 만료되었습니다: {image_ref}")
+        
+        if not allow_remote and image_ref.startswith(("http://", "https://")):
+            raise ValueError(
+                "외부 이미지 URL은 지원하지 않습니다. 이 서버의 이미지 URL(/image/{id}) 또는 base64 데이터를 사용하세요."
+            )
+        
+        # PIL/httpx를 불러오는 모듈이므로 필요할 때만 임포트
+        from src.image_utils import decode_base64_image, get_image_bytes
+        if len(image_ref) >= _THREAD_DECODE_MIN_SIZE and not image_ref.startswith(("http://", "https://")):
+            # 큰 base64는 스레드에서 디코딩 (여러 이미지를 동시에 읽을 때 이벤트 루프를 막지 않음)
+            return await asyncio.to_thread(decode_base64_image, image_ref)
+        return await get_image_bytes(image_ref)
+    
+    async def _to_image_url(self, image_ref: str) -> str:
+        """
+        이미지 참조를 서버 이미지 URL로 정규화합니다.
         
-        # 서버 내부 URL (/image/{id} 또는 {base_url}/image/{id})
-        if "/image/" in image_ref:
-            # URL에서 image_id 추출
-            image_id = image_ref.split("/image/")[-1].split("?")[0].split("#")[0]
-            image_info = await self.get_image(image_id)
-            if image_info:
-                return image_info["data"]
-            return None
+        data URL 또는 base64 문자열은 한 번 디코딩하여 저장한 뒤 URL을 반환하고,
+        서버 URL이나 외부 URL은 그대로 반환합니다.
         
-        # data URL (data:image/...;base64,...)
-        if image_ref.startswith("data:"):
-            _, data = image_ref.split(",", 1)
-            return base64.b64decode(data)
+        Args:
+            image_ref: 이미지 URL (/image/{id}), data URL, 또는 base64 문자열
+            
+        Returns:
+            이미지 URL (디코딩 실패 시 원래 참조)
+        """
+        if not image_ref or "/image/" in image_ref:
+            return image_ref
+        if image_ref.startswith("http://") or image_ref.startswith("https://"):
+            return image_ref
         
-        # 순수 base64
         try:
-            return base64.b64decode(image_ref)
+            return await self.store_base64_image(image_ref)
         except Exception:
-            return None
+            return image_ref
+    
+    async def _iter_zip(self, files: List[List[str]]) -> AsyncIterator[bytes]:
+        """
+        ZIP 파일을 조각 단위로 생성
+        
+        전체 아카이브를 메모리에 만들지 않고, 이미지를 하나씩 조회해 기록한 만큼 바로 내보냅니다.
+        
+        Args:
+            files: [[ZIP 내 파일명, 이미지 ID], ...]
+            
+        Yields:
+            ZIP 바이트 조각
+        """
+        # ZIP 생성 시에만 필요한 모듈은 지연 임포트 (모듈 로드 시간 단축)
+        import time
+        import zipfile
+        
+        writer = _ZipChunkWriter()
+        # PNG/WebP는 이미 압축된 포맷이므로 재압축(deflate) 없이 그대로 저장
+        date_time = time.localtime()[:6]
+        
+        with zipfile.ZipFile(writer, "w", zipfile.ZIP_STORED) as zf:
+            for filename, image_id in files:
+                # 저장된 바이트를 키로 바로 조회 (URL 파싱, 메타데이터 조회 없음)
+                image_bytes = await self._storage.get(image_key(image_id))
+                if not image_bytes:
+                    # 스트리밍 도중 이미지가 사라지면 일부만 담긴 ZIP을 정상 응답으로 끝내지 않고 중단
+                    raise RuntimeError(f"ZIP member image missing: {image_id}")
+                # ZipFile.open 스트림으로 바로 기록 (writestr의 중간 처리 경로 생략)
+                info = zipfile.ZipInfo(filename, date_time=date_time)
+                info.file_size = len(image_bytes)
+                with zf.open(info, "w", force_zip64=False) as dst:
+                    dst.write(image_bytes)
+                yield writer.drain()
+        
+        # 중앙 디렉터리 (ZipFile을 닫을 때 기록됨)
+        yield writer.drain()
+    
+    def _render_preview(self, context: Dict[str, Any]) -> str:
+        """저장된 렌더링 컨텍스트로 프리뷰 HTML 전체를 렌더링"""
+        return "".join(self._iter_preview(context))
+    
+    def _render_context_bytes(self, data: bytes, base_url: str) -> str:
+        """
+        저장된 컨텍스트 JSON 바이트로 프리뷰 HTML 렌더링 (_render_cached로 캐시됨)
+        
+        Args:
+            data: 저장소에 저장된 컨텍스트 JSON
+            base_url: 렌더링 시점의 베이스 URL (정적 파일 URL에 포함되므로 캐시 키에 포함)
+            
+        Returns:
+            렌더링된 HTML
+        """
+        return self._render_preview(json.loads(data))
     
-    async def _create_zip(
+    def _iter_preview(self, context: Dict[str, Any]) -> Iterable[str]:
+        """
+        저장된 렌더링 컨텍스트로 프리뷰 HTML을 조각 단위로 생성
+        
+        Args:
+            context: generate_before_preview/generate_after_preview가 저장한 컨텍스트
+            
+        Returns:
+            HTML 조각 시퀀스 (전체 문서를 한 번에 만들지 않음)
+        """
+        type_kwargs = _TYPE_CONTEXT[_resolve_emoticon_type(context["emoticon_type"])]
+        
+        if context["kind"] == "before":
+            return self._before_preview_parts(context, **type_kwargs)
+        
+        if type_kwargs["is_mini"]:
+            item_class = " mini-item"
+        elif type_kwargs["is_big"]:
+            item_class = " big-item"
+        else:
+            item_class = ""
+        
+        # 그리드는 항목 조각을 join으로 한 번에 만들어 Markup으로 전달 (템플릿 루프 생략)
+        item_format = AFTER_PREVIEW_ITEM.format_map
+        grid = Markup("".join([
+            item_format({
+                "item_class": item_class,
+                "index": idx,
+                "src": escape(_preview_image_url(emoticon["image_data"])),
+            })
+            for idx, emoticon in enumerate(context["emoticons"], 1)
+        ]))
+        
+        stream = _AFTER_TMPL.stream(
+            # 제목은 여러 위치에 출력되므로 한 번만 이스케이프한 Markup으로 전달
+            title=_escape_cached(context["title"]),
+            grid=grid,
+            emoticon_count=len(context["emoticons"]),
+            icon=context.get("icon"),
+            download_url=context["download_url"],
+            css_url=self._static_url("after-preview.css"),
+            js_url=self._static_url("after-preview.js"),
+            **type_kwargs
+        )
+        # 템플릿 출력 조각마다 전송하지 않고 5개씩 묶어 내보냄 (첫 조각은 바로 전송)
+        stream.enable_buffering(5)
+        return stream
+    
+    def _before_preview_parts(
         self,
-        emoticons: List[Dict[str, Any]],
-        icon: Optional[str],
-        file_format: str
-    ) -> bytes:
-        """ZIP 파일 생성"""
-        zip_buffer = io.BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-            for idx, emoticon in enumerate(emoticons, 1):
-                image_data = emoticon.get("image_data", "")
-                image_bytes = await self._get_image_bytes_from_ref(image_data)
-                if image_bytes:
-                    filename = f"emoticon_{idx:02d}.{file_format}"
-                    zf.writestr(filename, image_bytes)
+        context: Dict[str, Any],
+        emoticon_type_name: str,
+        spec: EmoticonSpec,
+        is_mini: bool,
+        is_big: bool,
+        **_: Any
+    ) -> List[str]:
+        """
+        before-preview HTML 조각 조립 (Jinja 없이 고정 조각 + 기획 항목 반복)
+        
+        Args:
+            context: generate_before_preview가 저장한 컨텍스트
             
-            if icon:
-                icon_bytes = await self._get_image_bytes_from_ref(icon)
-                if icon_bytes:
-                    zf.writestr("icon.png", icon_bytes)
+        Returns:
+            HTML 조각 목록
+        """
+        # 사용자 입력 문자열은 한 번만 HTML 이스케이프 (여러 위치에 출력됨)
+        title = _escape_cached(context["title"])
+        type_name = _escape_cached(emoticon_type_name)
+        plans = context["plans"]
+        
+        if is_mini:
+            grid_class, item_class = " mini-grid", " mini-item"
+        elif is_big:
+            grid_class, item_class = " big-grid", " big-item"
+        else:
+            grid_class = item_class = ""
+        
+        # 접두부/접미부 치환 값을 한 번에 계산하여 format_map으로 전달
+        page_ctx = {
+            "title": title,
+            "css": _BEFORE_CSS,
+            "emoticon_active": "" if is_mini else " active",
+            "mini_active": " active" if is_mini else "",
+            "type_name": type_name,
+            "grid_class": grid_class,
+            "count": len(plans),
+            "spec_count": spec.count,
+            "format": _escape_cached(spec.format),
+            "width": spec.sizes[0][0],
+            "height": spec.sizes[0][1],
+            "is_mini": "true" if is_mini else "false",
+            "is_big": "true" if is_big else "false",
+            "js_url": self._static_url("before-preview.js"),
+        }
+        
+        parts = [BEFORE_PREVIEW_PREFIX.format_map(page_ctx)]
+        item_format = BEFORE_PREVIEW_ITEM.format_map
+        parts.extend(
+            item_format({
+                "item_class": item_class,
+                "index": idx,
+                "desc": _escape_cached(plan.get("description", "")),
+            })
+            for idx, plan in enumerate(plans, 1)
+        )
+        parts.append(BEFORE_PREVIEW_SUFFIX.format_map(page_ctx))
+        return parts
+    
+    async def get_preview_stream(self, preview_id: str) -> Optional[Iterable[str]]:
+        """
+        저장된 렌더링 컨텍스트로 프리뷰 HTML 조각 스트림 반환
         
-        return zip_buffer.getvalue()
+        Args:
+            preview_id: 프리뷰 ID
+            
+        Returns:
+            HTML 조각 시퀀스 또는 None (프리뷰 없음)
+        """
+        key = preview_key(preview_id)
+        data = await self._storage.get(key)
+        if data:
+            # 이전 버전에서 저장된 렌더링 HTML은 그대로 반환
+            if not data.lstrip().startswith(b"{"):
+                return [data.decode('utf-8')]
+            return self._iter_preview(json.loads(data))
+        print(f"[DEBUG] Preview not found - key: {key}, preview_id: {preview_id}")
+        return None
     
     async def get_preview_html(self, preview_id: str) -> Optional[str]:
-        """저장된 프리뷰 HTML 반환"""
+        """저장된 렌더링 컨텍스트로 프리뷰 HTML 반환"""
         key = preview_key(preview_id)
         data = await self._storage.get(key)
         if data:
-            return data.decode('utf-8')
+            # 이전 버전에서 저장된 렌더링 HTML은 그대로 반환
+            if not data.lstrip().startswith(b"{"):
+                return data.decode('utf-8')
+            # 같은 제목/타입/기획으로 다시 만든 프리뷰는 컨텍스트가 같으므로 캐시 재사용
+            return self._render_cached(data, self.base_url)
         print(f"[DEBUG] Preview not found - key: {key}, preview_id: {preview_id}")
         return None
     
-    async def get_download_zip(self, download_id: str) -> Optional[bytes]:
-        """저장된 ZIP 파일 반환"""
+    async def get_preview_gzip(self, preview_id: str) -> Optional[bytes]:
+        """
+        gzip 압축된 프리뷰 HTML 반환
+        
+        처음 요청 시 한 번만 렌더링/압축하여 저장하고, 이후에는 저장된 압축본을 재사용합니다.
+        
+        Args:
+            preview_id: 프리뷰 ID
+            
+        Returns:
+            gzip 압축된 HTML 바이트 또는 None (프리뷰 없음)
+        """
+        gz_key = f"{preview_key(preview_id)}:gz"
+        cached = await self._storage.get(gz_key)
+        if cached:
+            return cached
+        
+        html = await self.get_preview_html(preview_id)
+        if html is None:
+            return None
+        
+        compressed = await asyncio.to_thread(gzip.compress, html.encode('utf-8'), 6)
+        await self._storage.set(gz_key, compressed, ttl=get_ttl("preview"))
+        return compressed
+    
+    async def get_download_stream(
+        self, download_id: str
+    ) -> Optional[Iterable[bytes] | AsyncIterator[bytes]]:
+        """
+        ZIP 다운로드 스트림 반환
+        
+        Args:
+            download_id: 다운로드 ID
+            
+        Returns:
+            ZIP 바이트 조각 시퀀스 또는 None (다운로드 없음, 또는 포함할 이미지가 만료됨)
+        """
         key = zip_key(download_id)
         data = await self._storage.get(key)
         if data:
-            return data
+            # 이전 버전에서 저장된 ZIP 바이트는 그대로 반환
+            if data.startswith(b"PK"):
+                return [data]
+            files = json.loads(data)["files"]
+            # 응답을 시작하기 전에 모든 이미지가 남아 있는지 확인 (일부가 빠진 ZIP을 내려주지 않음)
+            present = await asyncio.gather(
+                *(self._storage.exists(image_key(image_id)) for _, image_id in files)
+            )
+            if not all(present):
+                print(f"[DEBUG] ZIP member images expired - key: {key}, download_id: {download_id}")
+                return None
+            return self._iter_zip(files)
         print(f"[DEBUG] ZIP not found - key: {key}, download_id: {download_id}")
         return None
 
 
-# 전역 인스턴스
-_preview_generator: Optional[PreviewGenerator] = None
+# 전역 인스턴스 (베이스 URL별로 하나씩, 저장소는 get_storage() 싱글톤을 공유)
+@functools.lru_cache(maxsize=None)
+def _preview_generator_for(base_url: str) -> PreviewGenerator:
+    """정규화된 베이스 URL별 프리뷰 생성기 (lru_cache가 인스턴스 저장소 역할)"""
+    return PreviewGenerator(base_url)
 
 
 def get_preview_generator(base_url: str = "") -> PreviewGenerator:
-    """프리뷰 생성기 인스턴스 반환"""
-    global _preview_generator
-    if _preview_generator is None:
-        _preview_generator = PreviewGenerator(base_url)
-    # base_url이 변경되면 업데이트 (서버 시작 시 BASE_URL 환경변수가 늦게 설정될 수 있음)
-    elif base_url and _preview_generator.base_url != base_url.rstrip("/"):
-        _preview_generator.base_url = base_url.rstrip("/")
-    return _preview_generator
+    """
+    프리뷰 생성기 인스턴스 반환
+    
+    공유 인스턴스의 base_url을 바꾸지 않고 베이스 URL마다 인스턴스를 따로 두므로,
+    진행 중인 다른 요청의 URL이 중간에 바뀌지 않습니다. (조회는 C 구현 캐시 한 번)
+    """
+    return _preview_generator_for(base_url.rstrip("/"))
@@ -23,6 +23,7 @@ REDIS_URL 환경변수가 설정된 경우 Redis를 사용하고,
 import asyncio
 import json
 import os
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 from abc import ABC, abstractmethod
@@ -53,6 +54,11 @@ class BaseStorage(ABC):
         """키-값 저장 (바이너리)"""
         pass
     
+    @abstractmethod
+    async def set_nx(self, key: str, value: bytes, ttl: Optional[int] = None) -> bool:
+        """키가 없을 때만 저장 (저장했으면 True, 이미 존재하면 False)"""
+        pass
+    
     @abstractmethod
     async def delete(self, key: str) -> bool:
         """키 삭제"""
@@ -68,6 +74,11 @@ class BaseStorage(ABC):
         """패턴에 맞는 키 목록 조회"""
         pass
     
+    @abstractmethod
+    async def extend_ttl(self, key: str, ttl: int) -> bool:
+        """남은 만료 시간이 ttl보다 짧으면 ttl로 연장 (키가 있으면 True, 없으면 False)"""
+        pass
+    
     async def get_json(self, key: str) -> Optional[Any]:
         """JSON으로 저장된 값 조회"""
         data = await self.get(key)
@@ -95,16 +106,30 @@ class MemoryStorage(BaseStorage):
     메모리 기반 저장소 (Redis 미설정 시 폴백)
     
     주의: 서버 재시작 시 모든 데이터가 사라집니다.
+    최대 항목 수나 최대 용량을 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다 (LRU).
     """
     
     # 메모리 사용량 제한을 위한 최대 항목 수
-    MAX_ITEMS = 1000
+    # 환경변수로 커스터마이징 가능: MEMORY_STORAGE_MAX_ITEMS=5000 등
+    MAX_ITEMS = int(os.environ.get("MEMORY_STORAGE_MAX_ITEMS", 1000))
+    # 저장된 값의 총 바이트 수 제한 (큰 이미지 몇 개가 메모리를 독점하지 않도록)
+    # 환경변수로 커스터마이징 가능: MEMORY_STORAGE_MAX_BYTES=536870912 등
+    MAX_BYTES = int(os.environ.get("MEMORY_STORAGE_MAX_BYTES", 256 * 1024 * 1024))
     
     def __init__(self):
-        self._data: Dict[str, bytes] = {}
+        # 삽입/조회 순서를 유지하여 LRU 순서로 사용 (앞쪽이 가장 오래 사용되지 않은 항목)
+        self._data: "OrderedDict[str, bytes]" = OrderedDict()
         self._expiry: Dict[str, datetime] = {}
+        self._total_bytes = 0
         self._lock = asyncio.Lock()
     
+    def _pop_locked(self, key: str) -> None:
+        """항목 삭제 및 총 용량 갱신 (호출자가 락을 보유한 상태여야 함)"""
+        value = self._data.pop(key, None)
+        if value is not None:
+            self._total_bytes -= len(value)
+        self._expiry.pop(key, None)
+    
     async def _cleanup_expired(self) -> None:
         """만료된 키 정리"""
         now = datetime.now()
@@ -113,62 +138,87 @@ class MemoryStorage(BaseStorage):
             if expiry < now
         ]
         for key in expired_keys:
-            self._data.pop(key, None)
-            self._expiry.pop(key, None)
+            self._pop_locked(key)
     
     async def _enforce_max_items(self) -> None:
-        """최대 항목 수 초과 시 오래된 항목 삭제"""
-        if len(self._data) <= self.MAX_ITEMS:
-            return
-        
-        # 만료 시간이 있는 항목 중 가장 오래된 것부터 삭제
-        items_with_expiry = [
-            (key, expiry) for key, expiry in self._expiry.items()
-        ]
-        items_with_expiry.sort(key=lambda x: x[1])
-        
-        # 절반 정리
-        items_to_remove = len(self._data) - (self.MAX_ITEMS // 2)
-        for key, _ in items_with_expiry[:items_to_remove]:
-            self._data.pop(key, None)
+        """최대 항목 수/용량 초과 시 가장 오래 사용되지 않은 항목부터 삭제"""
+        # 방금 저장한 항목(맨 뒤)은 용량을 넘더라도 남겨 둠
+        while len(self._data) > self.MAX_ITEMS or (
+            self._total_bytes > self.MAX_BYTES and len(self._data) > 1
+        ):
+            key, value = self._data.popitem(last=False)
+            self._total_bytes -= len(value)
             self._expiry.pop(key, None)
     
     async def get(self, key: str) -> Optional[bytes]:
         async with self._lock:
             # 만료 확인
             if key in self._expiry and self._expiry[key] < datetime.now():
-                self._data.pop(key, None)
-                self._expiry.pop(key, None)
+                self._pop_locked(key)
                 return None
             
-            return self._data.get(key)
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+    
+    async def _set_locked(self, key: str, value: bytes, ttl: Optional[int]) -> None:
+        """값 저장 (호출자가 락을 보유한 상태여야 함)"""
+        old_value = self._data.get(key)
+        if old_value is not None:
+            self._total_bytes -= len(old_value)
+        self._data[key] = value
+        self._total_bytes += len(value)
+        self._data.move_to_end(key)
+        if ttl:
+            self._expiry[key] = datetime.now() + timedelta(seconds=ttl)
+        elif key in self._expiry:
+            del self._expiry[key]
+        
+        await self._enforce_max_items()
     
     async def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> bool:
         async with self._lock:
             await self._cleanup_expired()
-            await self._enforce_max_items()
-            
-            self._data[key] = value
-            if ttl:
-                self._expiry[key] = datetime.now() + timedelta(seconds=ttl)
-            elif key in self._expiry:
-                del self._expiry[key]
+            await self._set_locked(key, value, ttl)
+            return True
+    
+    async def set_nx(self, key: str, value: bytes, ttl: Optional[int] = None) -> bool:
+        async with self._lock:
+            await self._cleanup_expired()
+            if key in self._data:
+                return False
+            await self._set_locked(key, value, ttl)
             return True
     
     async def delete(self, key: str) -> bool:
         async with self._lock:
-            self._data.pop(key, None)
-            self._expiry.pop(key, None)
+            self._pop_locked(key)
             return True
     
     async def exists(self, key: str) -> bool:
         async with self._lock:
             if key in self._expiry and self._expiry[key] < datetime.now():
-                self._data.pop(key, None)
-                self._expiry.pop(key, None)
+                self._pop_locked(key)
                 return False
             return key in self._data
     
+    async def extend_ttl(self, key: str, ttl: int) -> bool:
+        async with self._lock:
+            expiry = self._expiry.get(key)
+            now = datetime.now()
+            if expiry is not None and expiry < now:
+                self._pop_locked(key)
+                return False
+            if key not in self._data:
+                return False
+            # 다시 참조되는 항목이므로 LRU 순서도 갱신
+            self._data.move_to_end(key)
+            new_expiry = now + timedelta(seconds=ttl)
+            if expiry is not None and expiry < new_expiry:
+                self._expiry[key] = new_expiry
+            return True
+    
     async def keys(self, pattern: str) -> List[str]:
         """패턴에 맞는 키 목록 조회 (간단한 prefix 패턴만 지원)"""
         async with self._lock:
@@ -190,6 +240,19 @@ class MemoryStorage(BaseStorage):
         pass
 
 
+# 남은 TTL이 ARGV[1]보다 짧을 때만 연장하는 Lua 스크립트 (키가 없으면 0 반환)
+_EXTEND_TTL_SCRIPT = """
+local remaining = redis.call('TTL', KEYS[1])
+if remaining == -2 then
+    return 0
+end
+if remaining >= 0 and remaining < tonumber(ARGV[1]) then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return 1
+"""
+
+
 class RedisStorage(BaseStorage):
     """
     Redis 기반 저장소
@@ -272,6 +335,14 @@ class RedisStorage(BaseStorage):
         result = await self._execute_with_retry(f"SET {key}", _set)
         return result is True
     
+    async def set_nx(self, key: str, value: bytes, ttl: Optional[int] = None) -> bool:
+        async def _set_nx(client):
+            # SET NX는 키가 이미 있으면 None 반환
+            return bool(await client.set(key, value, ex=ttl or None, nx=True))
+        
+        result = await self._execute_with_retry(f"SET NX {key}", _set_nx)
+        return result is True
+    
     async def delete(self, key: str) -> bool:
         result = await self._execute_with_retry(
             f"DELETE {key}",
@@ -286,6 +357,14 @@ class RedisStorage(BaseStorage):
         )
         return result is not None and result > 0
     
+    async def extend_ttl(self, key: str, ttl: int) -> bool:
+        async def _extend_ttl(client):
+            # TTL 조회와 연장을 원자적으로 처리 (만료 없는 키는 그대로 유지)
+            return await client.eval(_EXTEND_TTL_SCRIPT, 1, key, ttl)
+        
+        result = await self._execute_with_retry(f"EXTEND TTL {key}", _extend_ttl)
+        return bool(result)
+    
     async def keys(self, pattern: str) -> List[str]:
         """패턴에 맞는 키 목록 조회"""
         result = await self._execute_with_retry(
@@ -4,10 +4,12 @@
 Redis를 사용하여 작업 상태를 저장합니다.
 REDIS_URL이 설정되지 않은 경우 메모리 기반 저장소로 폴백합니다.
 """
+import asyncio
+import functools
 import secrets
-import string
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 from enum import Enum
 from dataclasses import dataclass, field
 
@@ -22,7 +24,7 @@ class TaskStatus(str, Enum):
     FAILED = "failed"         # 실패
 
 
-@dataclass
+@dataclass(slots=True)
 class GenerationTask:
     """이미지 생성 작업"""
     task_id: str
@@ -35,7 +37,17 @@ class GenerationTask:
     icon: Optional[Dict[str, Any]] = None
     error_message: Optional[str] = None
     created_at: datetime = field(default_factory=datetime.now)
-    updated_at: datetime = field(default_factory=datetime.now)
+    # 갱신 시각은 매 업데이트마다 바뀌므로 정수(ns)로 보관하고 직렬화할 때만 datetime으로 변환
+    updated_at_ns: int = field(default_factory=time.time_ns)
+    
+    @property
+    def updated_at(self) -> datetime:
+        """마지막 갱신 시각"""
+        return datetime.fromtimestamp(self.updated_at_ns / 1e9)
+    
+    def touch(self) -> None:
+        """갱신 시각을 현재로 설정"""
+        self.updated_at_ns = time.time_ns()
     
     def to_dict(self) -> Dict[str, Any]:
         """딕셔너리로 변환 (Redis 저장용)"""
@@ -51,7 +63,8 @@ class GenerationTask:
             "icon": self.icon,
             "error_message": self.error_message,
             "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat()
+            "updated_at": self.updated_at.isoformat(),
+            "updated_at_ns": self.updated_at_ns
         }
     
     @classmethod
@@ -64,11 +77,14 @@ class GenerationTask:
         elif created_at is None:
             created_at = datetime.now()
         
-        updated_at = data.get("updated_at")
-        if isinstance(updated_at, str):
-            updated_at = datetime.fromisoformat(updated_at)
-        elif updated_at is None:
-            updated_at = datetime.now()
+        # 정수 갱신 시각이 있으면 문자열 파싱 생략 (이전 형식 데이터는 ISO 문자열에서 변환)
+        updated_at_ns = data.get("updated_at_ns")
+        if updated_at_ns is None:
+            updated_at = data.get("updated_at")
+            if isinstance(updated_at, str):
+                updated_at_ns = int(datetime.fromisoformat(updated_at).timestamp() * 1e9)
+            else:
+                updated_at_ns = time.time_ns()
         
         # TaskStatus enum 파싱
         status = data.get("status", "pending")
@@ -86,7 +102,7 @@ class GenerationTask:
             icon=data.get("icon"),
             error_message=data.get("error_message"),
             created_at=created_at,
-            updated_at=updated_at
+            updated_at_ns=updated_at_ns
         )
 
 
@@ -95,16 +111,72 @@ class TaskStorage:
     
     def __init__(self):
         self._storage = get_storage()
+        # 작업별 변경 알림 이벤트 (상태 스트림 구독자가 있을 때만 생성)
+        self._update_events: Dict[str, asyncio.Event] = {}
+        # 작업별 구독자 수 (마지막 구독자가 종료되면 이벤트 제거)
+        self._watcher_counts: Dict[str, int] = {}
     
     def _generate_task_id(self, length: int = 12) -> str:
         """짧은 랜덤 작업 ID 생성"""
-        alphabet = string.ascii_letters + string.digits
-        return ''.join(secrets.choice(alphabet) for _ in range(length))
+        # 글자마다 secrets.choice를 호출하지 않고 urandom 한 번으로 URL 안전 문자열 생성
+        return secrets.token_urlsafe(length)[:length]
     
     async def _save_task(self, task: GenerationTask) -> None:
         """작업을 저장소에 저장"""
         key = task_key(task.task_id)
         await self._storage.set_json(key, task.to_dict(), ttl=get_ttl("task"))
+        self._notify_update(task.task_id)
+    
+    def _notify_update(self, task_id: str) -> None:
+        """작업 변경을 대기 중인 구독자에게 알림"""
+        event = self._update_events.pop(task_id, None)
+        if event:
+            event.set()
+    
+    async def watch_task(
+        self,
+        task_id: str,
+        heartbeat: float = 15.0
+    ) -> AsyncIterator[Optional[GenerationTask]]:
+        """
+        작업 변경을 구독합니다.
+        
+        변경될 때마다 최신 작업을 전달하고, heartbeat 초 동안 변경이 없으면 None을 전달합니다.
+        작업이 없거나 완료/실패 상태가 되면 종료합니다.
+        (다른 프로세스에서 변경된 경우에도 heartbeat 주기로 다시 조회하여 반영)
+        
+        Args:
+            task_id: 작업 ID
+            heartbeat: 변경이 없을 때 None을 전달하는 주기 (초)
+        """
+        last_updated_at = None
+        self._watcher_counts[task_id] = self._watcher_counts.get(task_id, 0) + 1
+        try:
+            while True:
+                # 조회 전에 이벤트를 등록해야 조회 직후의 변경을 놓치지 않음
+                event = self._update_events.setdefault(task_id, asyncio.Event())
+                task = await self.get_task(task_id)
+                if task is None:
+                    return
+                
+                if task.updated_at_ns != last_updated_at:
+                    last_updated_at = task.updated_at_ns
+                    yield task
+                
+                if task.status in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+                    return
+                
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            # 구독이 끝나면 (작업 없음/완료/연결 종료) 더 이상 기다리는 구독자가 없을 때 이벤트 제거
+            remaining = self._watcher_counts.pop(task_id, 1) - 1
+            if remaining > 0:
+                self._watcher_counts[task_id] = remaining
+            else:
+                self._update_events.pop(task_id, None)
     
     async def create_task(self, emoticon_type: str, total_count: int) -> GenerationTask:
         """새 작업 생성"""
@@ -131,7 +203,7 @@ class TaskStorage:
         task = await self.get_task(task_id)
         if task:
             task.status = status
-            task.updated_at = datetime.now()
+            task.touch()
             await self._save_task(task)
     
     async def update_task_progress(
@@ -145,7 +217,7 @@ class TaskStorage:
         if task:
             task.completed_count = completed_count
             task.current_description = current_description
-            task.updated_at = datetime.now()
+            task.touch()
             await self._save_task(task)
     
     async def add_emoticon(self, task_id: str, emoticon: Dict[str, Any]) -> None:
@@ -153,7 +225,33 @@ class TaskStorage:
         task = await self.get_task(task_id)
         if task:
             task.emoticons.append(emoticon)
-            task.updated_at = datetime.now()
+            task.touch()
+            await self._save_task(task)
+    
+    async def add_emoticons_bulk(
+        self,
+        task_id: str,
+        emoticons: List[Dict[str, Any]],
+        completed_count: Optional[int] = None,
+        current_description: Optional[str] = None
+    ) -> None:
+        """
+        생성된 이모티콘 여러 개와 진행 상황을 한 번의 조회/저장으로 반영
+        
+        Args:
+            task_id: 작업 ID
+            emoticons: 추가할 이모티콘 목록 (비어 있어도 됨)
+            completed_count: 완료 개수 (None이면 유지)
+            current_description: 현재 작업 설명 (None이면 유지)
+        """
+        task = await self.get_task(task_id)
+        if task:
+            task.emoticons.extend(emoticons)
+            if completed_count is not None:
+                task.completed_count = completed_count
+            if current_description is not None:
+                task.current_description = current_description
+            task.touch()
             await self._save_task(task)
     
     async def set_icon(self, task_id: str, icon: Dict[str, Any]) -> None:
@@ -161,7 +259,7 @@ class TaskStorage:
         task = await self.get_task(task_id)
         if task:
             task.icon = icon
-            task.updated_at = datetime.now()
+            task.touch()
             await self._save_task(task)
     
     async def set_error(self, task_id: str, error_message: str) -> None:
@@ -170,7 +268,7 @@ class TaskStorage:
         if task:
             task.status = TaskStatus.FAILED
             task.error_message = error_message
-            task.updated_at = datetime.now()
+            task.touch()
             await self._save_task(task)
     
     async def complete_task(self, task_id: str) -> None:
@@ -178,17 +276,11 @@ class TaskStorage:
         task = await self.get_task(task_id)
         if task:
             task.status = TaskStatus.COMPLETED
-            task.updated_at = datetime.now()
+            task.touch()
             await self._save_task(task)
 
 
-# 전역 인스턴스
-_task_storage: Optional[TaskStorage] = None
-
-
+@functools.cache
 def get_task_storage() -> TaskStorage:
-    """작업 저장소 인스턴스 반환"""
-    global _task_storage
-    if _task_storage is None:
-        _task_storage = TaskStorage()
-    return _task_storage
+    """작업 저장소 인스턴스 반환 (첫 호출에서 만든 인스턴스를 캐시)"""
+    return TaskStorage()
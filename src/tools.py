@@ -3,9 +3,10 @@ MCP 도구 구현
 """
 import os
 import asyncio
+import traceback
 from typing import List, Optional, Union
 
-from src.constants import EMOTICON_SPECS, EMOTICON_TYPE_NAMES, EmoticonType, get_emoticon_spec
+from src.constants import EMOTICON_SPECS, EMOTICON_TYPE_NAMES, get_emoticon_spec
 from src.models import (
     BeforePreviewRequest, BeforePreviewResponse,
     GenerateRequest, GenerateResponse, GeneratedEmoticon,
@@ -16,14 +17,25 @@ from src.models import (
 from src.preview_generator import get_preview_generator
 from src.checker import get_checker
 from src.image_utils import (
-    get_image_bytes, encode_base64_image, get_image_info,
-    process_emoticon_image, create_icon, video_to_animated_webp,
-    decode_base64_image
+    encode_base64_image, run_image_job,
+    process_emoticon_image, create_icon, video_to_animated_webp
 )
 from src.huggingface_client import get_hf_client
 from src.task_storage import get_task_storage, TaskStatus
 
 
+# 프리뷰/이미지 URL의 베이스 (요청마다 환경 변수를 다시 읽지 않도록 한 번만 조회)
+BASE_URL = os.environ.get("BASE_URL", "")
+
+# 동시에 진행할 이모티콘 생성 요청 수 (Hugging Face 요청 한도를 고려해 조절)
+HF_CONCURRENCY = max(1, int(os.environ.get("HF_CONCURRENCY", 4)))
+
+def _print_task_error(task_id: str, exc: BaseException) -> None:
+    """백그라운드 작업 예외 출력 (트레이스백 포함)"""
+    print(f"Background task error for {task_id}: {exc}")
+    traceback.print_exception(type(exc), exc, exc.__traceback__)
+
+
 async def before_preview(request: BeforePreviewRequest) -> BeforePreviewResponse:
     """
     이모티콘 제작 이전 프리뷰
@@ -31,13 +43,13 @@ async def before_preview(request: BeforePreviewRequest) -> BeforePreviewResponse
     카카오톡 채팅방과 같은 디자인의 페이지에서 이모티콘 탭 부분에
     이모티콘 설명이 글자로 써있는 형태의 프리뷰 페이지 URL을 반환합니다.
     """
-    generator = get_preview_generator(os.environ.get("BASE_URL", ""))
+    generator = get_preview_generator(BASE_URL)
     
-    # Enum을 문자열로 변환
-    emoticon_type_str = request.emoticon_type.value if isinstance(request.emoticon_type, EmoticonType) else request.emoticon_type
+    # Enum은 요청 모델에서 이미 문자열 값으로 변환됨
+    emoticon_type_str = request.emoticon_type
     
     plans = [
-        {"description": plan.description, "file_type": plan.file_type.value if hasattr(plan.file_type, 'value') else plan.file_type}
+        {"description": plan.description, "file_type": plan.file_type}
         for plan in request.plans
     ]
     
@@ -65,8 +77,8 @@ async def generate_async(
     즉시 작업 ID와 상태 확인 URL을 반환하고,
     백그라운드에서 이모티콘 생성을 진행합니다.
     """
-    emoticon_type_str = request.emoticon_type.value if isinstance(request.emoticon_type, EmoticonType) else request.emoticon_type
-    base_url = os.environ.get("BASE_URL", "")
+    emoticon_type_str = request.emoticon_type
+    base_url = BASE_URL
     
     # 작업 생성
     task_storage = get_task_storage()
@@ -94,9 +106,8 @@ async def generate_async(
         if t.done() and not t.cancelled():
             exc = t.exception()
             if exc:
-                import traceback
-                print(f"Background task error for {task.task_id}: {exc}")
-                traceback.print_exception(type(exc), exc, exc.__traceback__)
+                # 트레이스백 포맷/출력은 느릴 수 있으므로 이벤트 루프 밖에서 수행
+                t.get_loop().run_in_executor(None, _print_task_error, task.task_id, exc)
     
     background_task.add_done_callback(_log_exception)
     
@@ -122,92 +133,159 @@ async def _run_generation_task(
     generator = get_preview_generator(base_url)
     
     try:
-        await task_storage.update_task_status(task_id, TaskStatus.RUNNING)
-        
         spec = get_emoticon_spec(request.emoticon_type)
-        emoticon_type_str = request.emoticon_type.value if isinstance(request.emoticon_type, EmoticonType) else request.emoticon_type
+        emoticon_type_str = request.emoticon_type
         hf_client = get_hf_client(hf_token)
         
-        # 캐릭터 이미지 준비
+        # 상태 기록을 먼저 끝내야 캐릭터 준비가 실패했을 때 set_error가 늦게 끝난 기록에 덮어써지지 않음
+        await task_storage.update_task_status(task_id, TaskStatus.RUNNING)
         await task_storage.update_task_progress(task_id, 0, "캐릭터 이미지 준비 중...")
         
-        if request.character_image:
-            # 캐릭터 이미지가 제공된 경우 그것을 사용
-            character_bytes = await get_image_bytes(request.character_image)
-        elif request.character_description:
-            # 캐릭터 설명이 제공된 경우 그것을 바탕으로 생성
-            character_prompt = f"{request.character_description}, cartoon style, simple design, white background, suitable for emoticon/sticker, kawaii style"
-            character_bytes = await hf_client.generate_character(character_prompt)
-        else:
+        async def _prepare_character() -> bytes:
+            if request.character_image:
+                # 캐릭터 이미지가 제공된 경우 그것을 사용 (서버 이미지 URL은 저장소에서 바로 읽음)
+                return await generator.load_image_bytes(request.character_image)
+            if request.character_description:
+                # 캐릭터 설명이 제공된 경우 그것을 바탕으로 생성
+                character_prompt = f"{request.character_description}, cartoon style, simple design, white background, suitable for emoticon/sticker, kawaii style"
+                return await hf_client.generate_character(character_prompt)
             # 둘 다 없으면 기본 프롬프트 사용
-            character_bytes = await hf_client.generate_character(
+            return await hf_client.generate_character(
                 "A cute cartoon character with simple design, white background, "
                 "suitable for emoticon/sticker, kawaii style"
             )
         
-        emoticon_bytes_list: List[bytes] = []
+        # 캐릭터 이미지 준비
+        character_bytes = await _prepare_character()
         
-        for idx, emoticon_item in enumerate(request.emoticons):
-            await task_storage.update_task_progress(
-                task_id, 
-                idx, 
-                f"생성 중: {emoticon_item.description}"
-            )
-            
-            is_animated = spec.is_animated
+        # 아이콘은 첫 번째 이모티콘으로 만들므로 그 바이트만 보관
+        first_emoticon_bytes: Optional[bytes] = None
+        completed_count = 0
+        semaphore = asyncio.Semaphore(HF_CONCURRENCY)
+        
+        # 작업 저장소 갱신은 읽기-수정-쓰기이므로 전용 작성자 하나가 큐 순서대로 처리
+        # (생성 작업은 기록 완료를 기다리지 않고, 큐가 가득 찰 때만 대기)
+        # 항목: ("progress", 완료 개수, 설명) 또는 ("emoticon", 이모티콘 데이터)
+        status_queue: asyncio.Queue = asyncio.Queue(maxsize=32)
+        status_errors: List[BaseException] = []
+        
+        async def _status_writer() -> None:
+            reported_count = 0
+            while True:
+                # 쌓여 있는 갱신을 모두 꺼내 한 번의 조회/저장으로 묶어 반영
+                updates = [await status_queue.get()]
+                while not status_queue.empty():
+                    updates.append(status_queue.get_nowait())
+                
+                new_emoticons = []
+                description = None
+                for kind, *values in updates:
+                    if kind == "emoticon":
+                        new_emoticons.append(values[0])
+                    else:
+                        # 완료 개수는 줄어들지 않도록 최댓값 유지, 설명은 가장 최근 것 사용
+                        reported_count = max(reported_count, values[0])
+                        description = values[1]
+                try:
+                    await task_storage.add_emoticons_bulk(
+                        task_id, new_emoticons, reported_count, description
+                    )
+                except Exception as e:
+                    status_errors.append(e)
+                finally:
+                    for _ in updates:
+                        status_queue.task_done()
+        
+        status_writer = asyncio.create_task(_status_writer())
+        
+        # 반복마다 바뀌지 않는 규격 값은 루프 밖에서 한 번만 조회
+        is_animated = spec.is_animated
+        output_size = spec.sizes[0]
+        max_size_kb = spec.max_size_kb
+        mime_type = "image/webp" if is_animated or spec.format != "PNG" else "image/png"
+        
+        async def _generate_one(idx: int, emoticon_item) -> None:
+            nonlocal first_emoticon_bytes, completed_count
             
-            if is_animated:
-                video_bytes = await hf_client.generate_emoticon(
+            # 세마포어는 HF 요청 동안만 점유 (인코딩/저장은 슬롯을 반납한 뒤 진행하여
+            # 다음 이모티콘의 HF 요청과 이 이모티콘의 인코딩이 겹쳐 실행되도록 함)
+            async with semaphore:
+                await status_queue.put(
+                    ("progress", completed_count, f"생성 중: {emoticon_item.description}")
+                )
+                
+                raw_bytes = await hf_client.generate_emoticon(
                     character_image=character_bytes,
                     emoticon_description=emoticon_item.description,
-                    is_animated=True,
-                    animation_prompt=emoticon_item.description
+                    is_animated=is_animated,
+                    animation_prompt=emoticon_item.description if is_animated else None
                 )
-                
-                image_bytes = video_to_animated_webp(
-                    video_bytes,
-                    output_size=spec.sizes[0],
-                    max_size_kb=spec.max_size_kb,
+            
+            if is_animated:
+                # 비디오 디코딩/WebP 인코딩은 CPU 작업이므로 이미지 전용 스레드 풀에서 실행
+                image_bytes = await run_image_job(
+                    video_to_animated_webp,
+                    raw_bytes,
+                    output_size=output_size,
+                    max_size_kb=max_size_kb,
                     fps=15
                 )
-                mime_type = "image/webp"
             else:
-                raw_image = await hf_client.generate_emoticon(
-                    character_image=character_bytes,
-                    emoticon_description=emoticon_item.description,
-                    is_animated=False
-                )
-                
-                image_bytes = process_emoticon_image(raw_image, spec)
-                mime_type = "image/png" if spec.format == "PNG" else "image/webp"
+                image_bytes = await run_image_job(process_emoticon_image, raw_bytes, spec)
             
-            width, height, _ = get_image_info(image_bytes)
+            # 인코더가 항상 output_size로 맞춰 출력하므로 결과를 다시 디코딩해 크기를 읽지 않음
+            width, height = output_size
             size_kb = len(image_bytes) / 1024
             
             image_url = await generator.store_image(image_bytes, mime_type)
-            emoticon_bytes_list.append(image_bytes)
+            if idx == 0:
+                first_emoticon_bytes = image_bytes
             
             emoticon_data = {
                 "index": idx,
                 "image_data": image_url,
-                "file_extension": emoticon_item.file_extension.value if hasattr(emoticon_item.file_extension, 'value') else emoticon_item.file_extension,
+                "file_extension": emoticon_item.file_extension,
                 "width": width,
                 "height": height,
                 "size_kb": round(size_kb, 2)
             }
             
-            await task_storage.add_emoticon(task_id, emoticon_data)
-            await task_storage.update_task_progress(task_id, idx + 1, f"완료: {emoticon_item.description}")
+            completed_count += 1
+            await status_queue.put(("emoticon", emoticon_data))
+            await status_queue.put(
+                ("progress", completed_count, f"완료: {emoticon_item.description}")
+            )
+        
+        # 이모티콘별 생성은 서로 독립적이므로 HF_CONCURRENCY개까지 동시에 진행
+        jobs = [
+            asyncio.create_task(_generate_one(idx, emoticon_item))
+            for idx, emoticon_item in enumerate(request.emoticons)
+        ]
+        try:
+            await asyncio.gather(*jobs)
+            # 남은 상태 기록을 모두 반영한 뒤 다음 단계로 진행
+            await status_queue.join()
+        except BaseException:
+            # 하나라도 실패하면 남은 생성 요청은 취소
+            for job in jobs:
+                job.cancel()
+            raise
+        finally:
+            status_writer.cancel()
+        if status_errors:
+            raise status_errors[0]
         
         # 아이콘 생성
         await task_storage.update_task_progress(task_id, len(request.emoticons), "아이콘 생성 중...")
         
-        if emoticon_bytes_list:
-            icon_bytes = create_icon(emoticon_bytes_list[0], spec)
+        if first_emoticon_bytes is not None:
+            icon_source = first_emoticon_bytes
         else:
-            icon_bytes = create_icon(character_bytes, spec)
+            icon_source = character_bytes
+        icon_bytes = await run_image_job(create_icon, icon_source, spec)
         
-        icon_width, icon_height, _ = get_image_info(icon_bytes)
+        # create_icon은 항상 spec.icon_size로 리사이즈하므로 다시 디코딩하지 않음
+        icon_width, icon_height = spec.icon_size
         icon_url = await generator.store_image(icon_bytes, "image/png")
         
         icon_data = {
@@ -248,7 +326,8 @@ async def get_generation_result(task_id: str) -> dict:
             "status": "completed",
             "task_id": task_id,
             "emoticon_type": task.emoticon_type,
-            "emoticons": task.emoticons,
+            # 동시 생성으로 완료 순서가 섞일 수 있으므로 요청 순서대로 정렬
+            "emoticons": sorted(task.emoticons, key=lambda e: e.get("index", 0)),
             "icon": task.icon,
             "total_count": task.total_count,
             "message": "이모티콘 생성이 완료되었습니다."
@@ -279,13 +358,11 @@ async def after_preview(request: AfterPreviewRequest) -> AfterPreviewResponse:
     실제 이모티콘 이미지가 포함된 프리뷰 페이지 URL과
     ZIP 다운로드 URL을 반환합니다.
     """
-    generator = get_preview_generator(os.environ.get("BASE_URL", ""))
-    emoticon_type_str = request.emoticon_type.value if isinstance(request.emoticon_type, EmoticonType) else request.emoticon_type
+    generator = get_preview_generator(BASE_URL)
+    emoticon_type_str = request.emoticon_type
     
-    emoticons = [
-        {"image_data": emoticon.image_data, "frames": emoticon.frames}
-        for emoticon in request.emoticons
-    ]
+    # 프리뷰 생성에는 이미지 참조만 필요 (frames는 사용하지 않음)
+    emoticons = [{"image_data": emoticon.image_data} for emoticon in request.emoticons]
     
     preview_url, download_url = await generator.generate_after_preview(
         emoticon_type=emoticon_type_str,
@@ -310,19 +387,26 @@ async def check(request: CheckRequest) -> CheckResponse:
     파일 형식, 크기, 개수 등을 검사합니다.
     """
     checker = get_checker()
-    emoticon_type_str = request.emoticon_type.value if isinstance(request.emoticon_type, EmoticonType) else request.emoticon_type
+    generator = get_preview_generator(BASE_URL)
+    emoticon_type_str = request.emoticon_type
     
-    # 이미지 바이트로 변환
-    emoticon_bytes_list = []
-    for emoticon in request.emoticons:
-        emoticon_bytes = decode_base64_image(emoticon.file_data)
-        emoticon_bytes_list.append(emoticon_bytes)
+    # 이미지 바이트로 변환 (서버 이미지 URL은 저장소에서 바로 읽어 base64 전송/디코딩 생략, 항목별로 동시에 처리)
+    # 검사는 네트워크 요청 없이 동작하도록 외부 URL은 다운로드하지 않고 거부
+    refs = [emoticon.file_data for emoticon in request.emoticons]
+    if request.icon:
+        refs.append(request.icon.file_data)
+    loaded = await asyncio.gather(
+        *(generator.load_image_bytes(ref, allow_remote=False) for ref in refs)
+    )
     
     icon_bytes = None
     if request.icon:
-        icon_bytes = decode_base64_image(request.icon.file_data)
+        icon_bytes = loaded.pop()
+    emoticon_bytes_list = loaded
     
-    is_valid, issues = checker.check_emoticons(
+    # 이미지를 하나씩 열어 검사하는 CPU 작업이므로 이미지 전용 스레드 풀에서 실행
+    is_valid, issues = await run_image_job(
+        checker.check_emoticons,
         emoticon_type=emoticon_type_str,
         emoticons=emoticon_bytes_list,
         icon=icon_bytes